@@ -0,0 +1,92 @@
+"""connection_pool.py
+
+Small SQLite connection pool shared by the login, register and password
+reset screens. Connections are opened once in WAL mode with a busy
+timeout, so several counter terminals on the same database file wait for
+each other briefly instead of failing with "database is locked".
+"""
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+
+BUSY_TIMEOUT_MS = 5000
+CACHED_STATEMENTS = 256  # prepared statements kept per connection
+
+
+def configure_connection(conn):
+    """Apply the pragmas every pooled connection uses."""
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA synchronous=NORMAL")
+
+
+class ConnectionPool:
+    """Hands out reusable connections to one database file.
+
+    Use as:
+        with pool.connection() as conn:
+            db_utils.verify_user(conn, email, password)
+    """
+
+    def __init__(self, db_path, max_size=4):
+        self.db_path = db_path
+        self.max_size = max_size
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._opened = 0
+        self._closed = False
+
+    def _open(self):
+        conn = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT_MS / 1000,
+                               cached_statements=CACHED_STATEMENTS,
+                               check_same_thread=False)
+        configure_connection(conn)
+        return conn
+
+    def acquire(self):
+        """Take an idle connection, opening one if the pool is not full."""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._opened < self.max_size:
+                self._opened += 1
+                try:
+                    return self._open()
+                except Exception:
+                    self._opened -= 1
+                    raise
+        return self._idle.get()
+
+    def release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        if self._closed:
+            conn.close()
+            with self._lock:
+                self._opened -= 1
+        else:
+            self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close(self):
+        """Close idle connections; busy ones are closed when released."""
+        self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._opened -= 1
@@ -4,5 +4,6 @@ connection = sqlite3.connect('AccountSystem.db')
 cur = connection.cursor()
 cur.execute("CREATE TABLE IF NOT EXISTS AccountDB(ID INTEGER PRIMARY KEY, FirstName TEXT, LastName TEXT, "
             "EMAIL TEXT, Password TEXT)")
+cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_account_email ON AccountDB(EMAIL)")
 connection.commit()
 connection.close()
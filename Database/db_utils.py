@@ -0,0 +1,110 @@
+"""db_utils.py
+
+Data-access helpers for the AccountDB table used by the login, register
+and password reset screens. Every helper takes an open connection (for
+example from ConnectionPool) and uses fixed, parameterized SQL so SQLite's
+per-connection statement cache reuses the prepared statements.
+
+Passwords are stored hashed (see passwords.py); legacy plaintext rows and
+hashes made with an older cost are upgraded on the next successful login.
+"""
+import os
+import sqlite3
+
+import metrics
+from Database import passwords
+
+
+_CREATE_TABLE_SQL = ("CREATE TABLE IF NOT EXISTS AccountDB(ID INTEGER PRIMARY KEY, FirstName TEXT, "
+                     "LastName TEXT, EMAIL TEXT, Password TEXT)")
+_CREATE_INDEX_SQL = "CREATE UNIQUE INDEX IF NOT EXISTS idx_account_email ON AccountDB(EMAIL)"
+_EXISTS_SQL = "SELECT 1 FROM AccountDB WHERE EMAIL = ? LIMIT 1"
+_PASSWORD_SQL = "SELECT Password FROM AccountDB WHERE EMAIL = ?"
+_INSERT_SQL = "INSERT INTO AccountDB(FirstName, LastName, EMAIL, Password) VALUES (?, ?, ?, ?)"
+_UPDATE_PASSWORD_SQL = "UPDATE AccountDB SET Password = ? WHERE EMAIL = ?"
+
+# Emails known to exist. Accounts are never deleted, so only positive
+# answers are cached; a miss always goes back to the database, which keeps
+# the cache correct when another terminal registers the account.
+_known_users = set()
+
+# (policy, hash) checked against when an email has no account, so unknown
+# emails take as long to reject as wrong passwords
+_dummy = (None, None)
+
+
+def ensure_table(conn):
+    """Create AccountDB and its unique EMAIL index if they do not exist."""
+    conn.execute(_CREATE_TABLE_SQL)
+    try:
+        conn.execute(_CREATE_INDEX_SQL)
+    except sqlite3.IntegrityError:
+        # Older databases may already hold duplicate emails; still index
+        # the column so lookups are seeks, just without the constraint.
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_account_email_dup ON AccountDB(EMAIL)")
+    conn.commit()
+
+
+def clear_user_cache():
+    _known_users.clear()
+
+
+def _dummy_hash():
+    """A hash made with the current policy, rebuilt when the policy changes."""
+    global _dummy
+    policy = passwords.get_policy()
+    if _dummy[0] != policy:
+        _dummy = (policy, passwords.hash_password(os.urandom(16).hex(), policy))
+    return _dummy[1]
+
+
+@metrics.timed("db.user_exists")
+def user_exists(conn, email):
+    """Return True if an account with this email exists."""
+    if email in _known_users:
+        return True
+    found = conn.execute(_EXISTS_SQL, (email,)).fetchone() is not None
+    if found:
+        _known_users.add(email)
+    return found
+
+
+@metrics.timed("db.verify_user")
+def verify_user(conn, email, password):
+    """Return True if email/password match a stored account."""
+    row = conn.execute(_PASSWORD_SQL, (email,)).fetchone()
+    if row is None:
+        # Do the same work as for a known email so timing does not tell
+        # whether the account exists
+        passwords.verify_password(password, _dummy_hash())
+        return False
+    _known_users.add(email)
+    if not passwords.verify_password(password, row[0]):
+        return False
+    if passwords.needs_rehash(row[0]):
+        update_password(conn, email, password)
+    return True
+
+
+@metrics.timed("db.add_user")
+def add_user(conn, first_name, last_name, email, password):
+    """Create an account. Returns False if the email is already registered."""
+    if user_exists(conn, email):
+        return False
+    try:
+        conn.execute(_INSERT_SQL, (first_name, last_name, email, passwords.hash_password(password)))
+        conn.commit()
+    except sqlite3.IntegrityError:
+        conn.rollback()
+        _known_users.add(email)
+        return False
+    _known_users.add(email)
+    return True
+
+
+@metrics.timed("db.update_password")
+def update_password(conn, email, new_password):
+    """Set a new password for email. Returns True if an account was updated."""
+    cur = conn.execute(_UPDATE_PASSWORD_SQL, (passwords.hash_password(new_password), email))
+    conn.commit()
+    return cur.rowcount > 0
@@ -0,0 +1,258 @@
+"""history_db.py
+
+SQLite persistence for the billing calculation history. Records are the
+same dicts HistoryManager builds in add_calculation; writes are buffered
+and committed in batches, and reads page through the table by ID so a
+large history never has to be loaded at once.
+
+Several terminals can share the table. Each HistoryStore tags the rows it
+writes with its own session ID, and clear() only deletes those.
+"""
+import sqlite3
+import uuid
+
+import metrics
+
+
+# record key -> column name, in table order
+COLUMNS = (
+    ("timestamp", "Timestamp"),
+    ("customer_name", "CustomerName"),
+    ("account", "Account"),
+    ("kwh_used", "KwhUsed"),
+    ("total_cost", "TotalCost"),
+    ("customer_type", "CustomerType"),
+    ("discount_value", "DiscountValue"),
+    ("discount_amount", "DiscountAmount"),
+    ("billing_month", "BillingMonth"),
+)
+
+RECORD_KEYS = tuple(key for key, _ in COLUMNS)
+_COLUMN_LIST = ", ".join(col for _, col in COLUMNS)
+_INSERT_SQL = (f"INSERT INTO HistoryDB({_COLUMN_LIST}, Session) "
+               f"VALUES ({', '.join('?' for _ in COLUMNS)}, ?)")
+
+
+def ensure_history_table(conn):
+    """Create the history table and its indexes if they do not exist."""
+    conn.execute("CREATE TABLE IF NOT EXISTS HistoryDB(ID INTEGER PRIMARY KEY, Timestamp TEXT, "
+                 "CustomerName TEXT, Account TEXT, KwhUsed REAL, TotalCost REAL, CustomerType TEXT, "
+                 "DiscountValue TEXT, DiscountAmount REAL, BillingMonth TEXT, Session TEXT)")
+    # Tables from before sessions: their rows belong to no session
+    if "Session" not in [row[1] for row in conn.execute("PRAGMA table_info(HistoryDB)")]:
+        conn.execute("ALTER TABLE HistoryDB ADD COLUMN Session TEXT")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_history_account ON HistoryDB(Account)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_history_month ON HistoryDB(BillingMonth)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_history_timestamp ON HistoryDB(Timestamp)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_history_session ON HistoryDB(Session)")
+    conn.commit()
+
+
+def _to_record(row):
+    return dict(zip(RECORD_KEYS, row[1:]))
+
+
+def _to_page_record(row):
+    record = _to_record(row)
+    record["id"] = row[0]
+    return record
+
+
+class Totals:
+    """Count, kWh, cost and discount sums for a group of records."""
+    __slots__ = ("count", "kwh", "cost", "discount")
+
+    def __init__(self):
+        self.count = 0
+        self.kwh = 0.0
+        self.cost = 0.0
+        self.discount = 0.0
+
+    def add(self, count, kwh, cost, discount):
+        self.count += count
+        if self.count:
+            self.kwh += kwh
+            self.cost += cost
+            self.discount += discount
+        else:
+            # Back to empty: drop any float residue from add/remove pairs
+            self.kwh = self.cost = self.discount = 0.0
+
+
+class HistoryAggregates:
+    """Running history totals, overall and per consumer type / billing month.
+
+    add() and remove() are O(1), so the summary never rescans the history.
+    """
+
+    def __init__(self):
+        self.overall = Totals()
+        self.by_type = {}
+        self.by_month = {}
+
+    def add_group(self, customer_type, billing_month, count, kwh, cost, discount):
+        """Apply a pre-summed group of records (negative values remove them)."""
+        self.overall.add(count, kwh, cost, discount)
+        for groups, key in ((self.by_type, customer_type), (self.by_month, billing_month)):
+            totals = groups.get(key)
+            if totals is None:
+                totals = groups[key] = Totals()
+            totals.add(count, kwh, cost, discount)
+            if not totals.count:
+                del groups[key]
+
+    def add(self, record):
+        self.add_group(record["customer_type"], record["billing_month"], 1,
+                       record["kwh_used"], record["total_cost"], record["discount_amount"])
+
+    def remove(self, record):
+        self.add_group(record["customer_type"], record["billing_month"], -1,
+                       -record["kwh_used"], -record["total_cost"], -record["discount_amount"])
+
+    def reset(self):
+        self.__init__()
+
+    @property
+    def count(self):
+        return self.overall.count
+
+    @property
+    def kwh(self):
+        return self.overall.kwh
+
+    @property
+    def cost(self):
+        return self.overall.cost
+
+    @property
+    def discount(self):
+        return self.overall.discount
+
+
+class HistoryStore:
+    """Buffered, paged access to the HistoryDB table.
+
+    session tags the rows this store writes (a fresh ID if None).
+    """
+
+    def __init__(self, db_path, batch_size=100, session=None):
+        self.conn = sqlite3.connect(db_path)
+        self.batch_size = batch_size
+        self.session = session or uuid.uuid4().hex
+        self._pending = []
+        ensure_history_table(self.conn)
+
+    def add(self, record):
+        """Queue a record; it is written once batch_size records are queued."""
+        self._pending.append((*(record[key] for key in RECORD_KEYS), self.session))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    @metrics.timed("db.history_flush")
+    def flush(self):
+        """Write all queued records in a single transaction."""
+        if not self._pending:
+            return
+        with self.conn:
+            self.conn.executemany(_INSERT_SQL, self._pending)
+        self._pending.clear()
+
+    @property
+    def pending(self):
+        return len(self._pending)
+
+    def iter_records(self, page_size=1000, account=None, billing_month=None, limit=None,
+                     max_id=None):
+        """Yield records oldest first, fetching page_size rows per query.
+
+        max_id stops at that row ID (see max_id()), so a reader can ignore
+        rows added after it started, by this or any other terminal.
+        limit stops after that many records.
+        """
+        self.flush()
+        where = ["ID > ?"]
+        filters = []
+        if max_id is not None:
+            where.append("ID <= ?")
+            filters.append(max_id)
+        if account is not None:
+            where.append("Account = ?")
+            filters.append(account)
+        if billing_month is not None:
+            where.append("BillingMonth = ?")
+            filters.append(billing_month)
+        sql = (f"SELECT ID, {_COLUMN_LIST} FROM HistoryDB WHERE {' AND '.join(where)} "
+               f"ORDER BY ID LIMIT ?")
+        last_id = 0
+        remaining = limit
+        while remaining is None or remaining > 0:
+            size = page_size if remaining is None else min(page_size, remaining)
+            rows = self.conn.execute(sql, (last_id, *filters, size)).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield _to_record(row)
+            last_id = rows[-1][0]
+            if remaining is not None:
+                remaining -= len(rows)
+
+    @metrics.timed("db.history_page")
+    def page(self, limit, after_id=None, before_id=None):
+        """Return up to `limit` records, oldest first, each with its row "id".
+
+        With after_id, the first records after that ID; with before_id, the
+        last records before it; with neither, the newest records. Pages are
+        keyed on ID, so rows added meanwhile by other terminals never shift
+        them and each page is an index seek however deep it is.
+        """
+        self.flush()
+        select = f"SELECT ID, {_COLUMN_LIST} FROM HistoryDB"
+        if after_id is not None:
+            rows = self.conn.execute(f"{select} WHERE ID > ? ORDER BY ID LIMIT ?",
+                                     (after_id, limit)).fetchall()
+        else:
+            rows = self.conn.execute(f"{select} WHERE ID < ? ORDER BY ID DESC LIMIT ?",
+                                     (before_id if before_id is not None else 2 ** 63 - 1,
+                                      limit)).fetchall()
+            rows.reverse()
+        return [_to_page_record(row) for row in rows]
+
+    def max_id(self):
+        """ID of the newest row; a snapshot bound for exports."""
+        self.flush()
+        return self.conn.execute("SELECT COALESCE(MAX(ID), 0) FROM HistoryDB").fetchone()[0]
+
+    @metrics.timed("db.history_count")
+    def count(self, max_id=None):
+        self.flush()
+        if max_id is None:
+            return self.conn.execute("SELECT COUNT(*) FROM HistoryDB").fetchone()[0]
+        return self.conn.execute("SELECT COUNT(*) FROM HistoryDB WHERE ID <= ?",
+                                 (max_id,)).fetchone()[0]
+
+    @metrics.timed("db.history_aggregates")
+    def aggregates(self, max_id=None):
+        """Build HistoryAggregates in one grouped query, over the whole
+        table or only the rows up to max_id."""
+        self.flush()
+        aggregates = HistoryAggregates()
+        where = "" if max_id is None else " WHERE ID <= ?"
+        rows = self.conn.execute(
+            "SELECT CustomerType, BillingMonth, COUNT(*), SUM(KwhUsed), SUM(TotalCost), "
+            f"SUM(DiscountAmount) FROM HistoryDB{where} GROUP BY CustomerType, BillingMonth",
+            () if max_id is None else (max_id,)
+        )
+        for row in rows:
+            aggregates.add_group(*row)
+        return aggregates
+
+    @metrics.timed("db.history_clear")
+    def clear(self):
+        """Delete this session's records; other terminals' rows are kept."""
+        self._pending.clear()
+        with self.conn:
+            self.conn.execute("DELETE FROM HistoryDB WHERE Session = ?", (self.session,))
+
+    def close(self):
+        self.flush()
+        self.conn.close()
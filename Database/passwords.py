@@ -0,0 +1,189 @@
+"""passwords.py
+
+Password hashing for AccountDB. Stored values carry their scheme and cost
+parameters, e.g.
+
+    scrypt$n=16384,r=8,p=1$<salt>$<hash>
+    pbkdf2_sha256$i=600000$<salt>$<hash>
+
+so the cost can be raised at any time: old hashes still verify, and
+needs_rehash() tells the caller to store a fresh hash after a successful
+login. Values without a recognised scheme are legacy plaintext passwords.
+
+Run ``python -m Database.passwords`` to benchmark verification latency and
+throughput for a range of cost settings.
+"""
+import base64
+import hashlib
+import hmac
+import os
+
+
+SALT_BYTES = 16
+KEY_BYTES = 32
+
+# Cost parameters every stored hash of a scheme must carry
+_PARAM_KEYS = {"scrypt": {"n", "r", "p"}, "pbkdf2_sha256": {"i"}}
+
+
+class PasswordPolicy:
+    """Scheme and cost parameters used for new hashes."""
+
+    def __init__(self, scheme="scrypt", **params):
+        if scheme == "scrypt":
+            params = {"n": 2 ** 14, "r": 8, "p": 1, **params}
+        elif scheme == "pbkdf2_sha256":
+            params = {"i": 600000, **params}
+        else:
+            raise ValueError(f"Unknown password scheme: {scheme}")
+        self.scheme = scheme
+        self.params = {k: int(v) for k, v in params.items()}
+
+    def __repr__(self):
+        return f"PasswordPolicy({self.scheme!r}, {_format_params(self.params)})"
+
+    def __eq__(self, other):
+        return (isinstance(other, PasswordPolicy) and self.scheme == other.scheme
+                and self.params == other.params)
+
+
+_policy = PasswordPolicy()
+
+
+def set_policy(policy):
+    """Change the policy used for new hashes (and for needs_rehash)."""
+    global _policy
+    _policy = policy
+
+
+def get_policy():
+    return _policy
+
+
+def _format_params(params):
+    return ",".join(f"{k}={v}" for k, v in sorted(params.items()))
+
+
+def _parse_params(text):
+    return {k: int(v) for k, v in (item.split("=", 1) for item in text.split(","))}
+
+
+def _b64(data):
+    return base64.b64encode(data).decode("ascii").rstrip("=")
+
+
+def _unb64(text):
+    return base64.b64decode(text + "=" * (-len(text) % 4))
+
+
+def _derive(scheme, params, password, salt):
+    password = password.encode("utf-8")
+    if scheme == "scrypt":
+        n, r, p = params["n"], params["r"], params["p"]
+        return hashlib.scrypt(password, salt=salt, n=n, r=r, p=p,
+                              maxmem=256 * n * r + (1 << 20), dklen=KEY_BYTES)
+    if scheme == "pbkdf2_sha256":
+        return hashlib.pbkdf2_hmac("sha256", password, salt, params["i"], dklen=KEY_BYTES)
+    raise ValueError(f"Unknown password scheme: {scheme}")
+
+
+def _split(encoded):
+    """Return (scheme, params, salt, key) or None for legacy plaintext.
+
+    Raises ValueError for a value that names a scheme but is malformed.
+    """
+    parts = str(encoded).split("$")
+    if len(parts) != 4 or parts[0] not in _PARAM_KEYS:
+        return None
+    params = _parse_params(parts[1])
+    if set(params) != _PARAM_KEYS[parts[0]]:
+        raise ValueError(f"Malformed {parts[0]} parameters: {parts[1]!r}")
+    return parts[0], params, _unb64(parts[2]), _unb64(parts[3])
+
+
+def hash_password(password, policy=None):
+    """Hash password with policy (default: the current policy)."""
+    policy = policy or _policy
+    salt = os.urandom(SALT_BYTES)
+    key = _derive(policy.scheme, policy.params, password, salt)
+    return f"{policy.scheme}${_format_params(policy.params)}${_b64(salt)}${_b64(key)}"
+
+
+def verify_password(password, encoded):
+    """Check password against a stored value (hash or legacy plaintext)."""
+    if encoded is None:
+        return False
+    try:
+        parsed = _split(encoded)
+        if parsed is None:
+            return hmac.compare_digest(str(encoded).encode("utf-8"), password.encode("utf-8"))
+        scheme, params, salt, key = parsed
+        return hmac.compare_digest(_derive(scheme, params, password, salt), key)
+    except (ValueError, OverflowError, MemoryError):
+        return False  # malformed hash or cost parameters hashlib rejects
+
+
+def needs_rehash(encoded, policy=None):
+    """True if encoded was not produced with policy (plaintext always is)."""
+    policy = policy or _policy
+    try:
+        parsed = _split(encoded)
+    except ValueError:
+        return True
+    return parsed is None or parsed[0] != policy.scheme or parsed[1] != policy.params
+
+
+# ========== BENCHMARK ==========
+BENCH_POLICIES = [
+    PasswordPolicy("scrypt", n=2 ** 13),
+    PasswordPolicy("scrypt", n=2 ** 14),
+    PasswordPolicy("scrypt", n=2 ** 15),
+    PasswordPolicy("pbkdf2_sha256", i=200000),
+    PasswordPolicy("pbkdf2_sha256", i=600000),
+]
+
+
+def benchmark(policies=None, rounds=20, threads=1):
+    """Time verify_password per policy.
+
+    Returns a list of dicts with policy, median/p95 latency (ms) and
+    verifications per second using `threads` concurrent workers.
+    """
+    import statistics
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+
+    results = []
+    for policy in policies or BENCH_POLICIES:
+        encoded = hash_password("correct horse battery staple", policy)
+
+        def one(_):
+            start = time.perf_counter()
+            verify_password("correct horse battery staple", encoded)
+            return time.perf_counter() - start
+
+        wall = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            timings = sorted(pool.map(one, range(rounds)))
+        wall = time.perf_counter() - wall
+
+        results.append({
+            "policy": repr(policy),
+            "median_ms": statistics.median(timings) * 1000,
+            "p95_ms": timings[min(len(timings) - 1, int(len(timings) * 0.95))] * 1000,
+            "per_second": rounds / wall,
+        })
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark password verification cost settings.")
+    parser.add_argument("--rounds", type=int, default=20, help="verifications per setting")
+    parser.add_argument("--threads", type=int, default=1, help="concurrent verifications")
+    args = parser.parse_args()
+
+    print(f"{'Policy':52} {'median ms':>10} {'p95 ms':>10} {'verify/s':>10}")
+    for row in benchmark(rounds=args.rounds, threads=args.threads):
+        print(f"{row['policy']:52} {row['median_ms']:10.1f} {row['p95_ms']:10.1f} {row['per_second']:10.1f}")
@@ -4,18 +4,21 @@ Lightweight orchestrator that composes the modular login and register
 frames into a single application window.
 """
 from tkinter import Tk, Frame, messagebox
-import sqlite3
+import time
+
+import metrics
 
 from register_page import build_register_frame
 from login_page import build_login_frame
 from Database import db_utils
-from electric_bill_gui import open_main_app
+from Database.connection_pool import ConnectionPool
 
 
 DB_PATH = "Database/AccountSystem.db"
 
 
 def main():
+    start = time.perf_counter()
     root = Tk()
     root.title('Electric Bill Account System')
 
@@ -26,10 +29,13 @@ def main():
     y = (root.winfo_screenheight() // 2) - (height // 2)
     root.geometry(f"{width}x{height}+{x}+{y}")
 
+    # one pool of DB connections shared by every screen
+    pool = ConnectionPool(DB_PATH)
+    root.bind("<Destroy>", lambda e: pool.close() if e.widget is root else None)
+
     # ensure DB/table exists
-    conn = sqlite3.connect(DB_PATH)
-    db_utils.ensure_table(conn)
-    conn.close()
+    with pool.connection() as conn:
+        db_utils.ensure_table(conn)
 
     # container frames
     sign_in = Frame(root)
@@ -43,7 +49,16 @@ def main():
     root.grid_rowconfigure(0, weight=1)
     root.grid_columnconfigure(0, weight=1)
 
+    # Screens are built the first time they are shown, so startup only
+    # pays for the login UI.
+    builders = {}
+    built = set()
+
     def show_frame(frame):
+        if frame not in built:
+            built.add(frame)
+            with metrics.span(f"frame_build.{builders[frame].__name__.replace('build_', '')}"):
+                builders[frame]()
         frame.tkraise()
 
     # callback: after successful registration, show success screen
@@ -63,30 +78,50 @@ def main():
         show_frame(sign_in)
 
     # build modular UIs inside the containers
-    reg_frame = build_register_frame(sign_up, DB_PATH, on_show_login=lambda: show_frame(sign_in), on_register_success=on_register_success)
-    reg_frame.pack(fill='both', expand=True)
+    def build_register():
+        reg_frame = build_register_frame(sign_up, DB_PATH, on_show_login=lambda: show_frame(sign_in), on_register_success=on_register_success, pool=pool)
+        reg_frame.pack(fill='both', expand=True)
 
-    login_frame = build_login_frame(sign_in, DB_PATH, on_login_success=on_login_success, on_show_register=lambda: show_frame(sign_up))
-    login_frame.pack(fill='both', expand=True)
+    def build_login():
+        login_frame = build_login_frame(sign_in, DB_PATH, on_login_success=on_login_success, on_show_register=lambda: show_frame(sign_up), pool=pool)
+        login_frame.pack(fill='both', expand=True)
 
     # build account/billing system frame
-    account_frame = open_main_app(parent=account, on_logout=on_logout)
-    account_frame.pack(fill='both', expand=True)
+    def build_account():
+        from electric_bill_gui import open_main_app
+        account_frame = open_main_app(parent=account, on_logout=on_logout, db_path=DB_PATH)
+        account_frame.pack(fill='both', expand=True)
 
     # build success screen
-    from tkinter import Label, Button
-    success_frame = Frame(success, bg="#525561")
-    success_frame.pack(fill='both', expand=True)
-    
-    Label(success_frame, text="Registration Successful!", fg="#FFFFFF", font=("Arial", 24, "bold"), bg="#525561").pack(pady=50)
-    Label(success_frame, text="Your account has been created successfully.", fg="#FFFFFF", font=("Arial", 12), bg="#525561").pack(pady=10)
-    Button(success_frame, text="Proceed to Login", command=on_success_to_login, bg="#206DB4", fg="white", font=("Arial", 12), padx=20, pady=10).pack(pady=20)
+    def build_success():
+        from tkinter import Label, Button
+        success_frame = Frame(success, bg="#525561")
+        success_frame.pack(fill='both', expand=True)
+
+        Label(success_frame, text="Registration Successful!", fg="#FFFFFF", font=("Arial", 24, "bold"), bg="#525561").pack(pady=50)
+        Label(success_frame, text="Your account has been created successfully.", fg="#FFFFFF", font=("Arial", 12), bg="#525561").pack(pady=10)
+        Button(success_frame, text="Proceed to Login", command=on_success_to_login, bg="#206DB4", fg="white", font=("Arial", 12), padx=20, pady=10).pack(pady=20)
+
+    builders.update({sign_up: build_register, sign_in: build_login,
+                     account: build_account, success: build_success})
 
     # show login by default
     show_frame(sign_in)
 
+    # idle callbacks run after Tk's pending redraws, i.e. after first paint;
+    # shown as the "first_paint" span in the diagnostics panel
+    if metrics.enabled():
+        root.after_idle(lambda: metrics.record("first_paint", time.perf_counter() - start))
+
+    # F12 opens the metrics panel
+    def show_diagnostics(event=None):
+        from diagnostics import open_diagnostics
+        open_diagnostics(root)
+    root.bind("<F12>", show_diagnostics)
+
     root.resizable(False, False)
     root.mainloop()
+    metrics.stop_file_writer()
 
 
 if __name__ == "__main__":
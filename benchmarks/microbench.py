@@ -0,0 +1,325 @@
+"""microbench.py
+
+Microbenchmarks for the hot paths: pricing (scalar, per input
+distribution, and batch), history paging and rendering at 1k/10k/100k
+records, the CSV/TXT export writers, PDF rendering and login
+verification. Each case is timed with timeit (best of several repeats)
+and saved to JSON. Saved runs can be compared to catch slowdowns.
+
+Usage:
+    python benchmarks/microbench.py run [-o results.json] [-k FILTER]
+    python benchmarks/microbench.py compare base.json new.json [--threshold 0.10]
+
+run saves to results-<time>.json in the current directory unless -o is
+given. compare exits with status 1 if any case got slower than the threshold
+(a fraction, 0.10 = 10%). Cases that need a display (render_history)
+are skipped without one.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+HISTORY_SIZES = (1000, 10000, 100000)
+WRITER_RECORDS = 10000
+REPEAT = 5
+MIN_TIME = 0.2  # seconds each timing run should last
+
+# name -> setup(): returns (callable to time, operations per call)
+CASES = {}
+
+
+class Skip(Exception):
+    """Raised by a setup when the case cannot run here."""
+
+
+def case(name):
+    def register(setup):
+        CASES[name] = setup
+        return setup
+    return register
+
+
+def measure(fn, ops):
+    """Best and median seconds per operation over REPEAT timing runs."""
+    timer = timeit.Timer(fn)
+    number, elapsed = timer.autorange()
+    number = max(1, int(number * MIN_TIME / max(elapsed, 1e-9)))
+    runs = sorted(t / (number * ops) for t in timer.repeat(REPEAT, number))
+    return {"best": runs[0], "median": runs[len(runs) // 2], "loops": number * ops}
+
+
+# ========== PRICING ==========
+# kWh readings by distribution, 1000 each
+DISTRIBUTIONS = {
+    "first_tier": lambda rng: rng.uniform(0, 50),
+    "typical": lambda rng: rng.uniform(50, 400),
+    "large": lambda rng: rng.uniform(400, 5000),
+    "whole_kwh": lambda rng: float(rng.randint(0, 1500)),
+    "zero_or_negative": lambda rng: rng.choice((0.0, -rng.uniform(0, 10))),
+}
+
+
+def _readings(kind, n=1000, seed=0):
+    rng = random.Random(seed)
+    return [(DISTRIBUTIONS[kind](rng), rng.choice(("residential", "commercial")), rng.random() < 0.3)
+            for _ in range(n)]
+
+
+@case("tiered/residential")
+def _tiered():
+    from billing_core import tiered
+    from tariffs import current_tariff
+    schedule = current_tariff().schedules["residential"]
+    tiers = [(upper - start, rate) for upper, start, rate
+             in zip(schedule.uppers, schedule.starts, schedule.rates)]
+    units = [u for u, _, _ in _readings("typical")]
+    return lambda: [tiered(u, tiers) for u in units], len(units)
+
+
+def _calculate_bill_case(kind):
+    def setup():
+        from billing_core import calculate_bill
+        rows = _readings(kind)
+        return lambda: [calculate_bill(*r) for r in rows], len(rows)
+    return setup
+
+
+for _kind in DISTRIBUTIONS:
+    case(f"calculate_bill/{_kind}")(_calculate_bill_case(_kind))
+
+
+@case("calculate_bills/10k")
+def _calculate_bills():
+    from batch_billing import calculate_bills
+    units, types, senior = zip(*_readings("whole_kwh", 10000))
+    return lambda: calculate_bills(units, types, senior), len(units)
+
+
+# ========== HISTORY ==========
+def _records(n, seed=0):
+    rng = random.Random(seed)
+    for i in range(n):
+        kwh = rng.uniform(0, 1500)
+        yield {
+            "timestamp": f"2024-{i % 12 + 1:02d}-01 12:00:00",
+            "customer_name": f"Customer {i}",
+            "account": f"ACC-{i:07d}",
+            "kwh_used": kwh,
+            "total_cost": kwh * 9.5,
+            "customer_type": rng.choice(("Residential", "Commercial")),
+            "discount_value": rng.choice(("None", "Senior Citizen (5%)")),
+            "discount_amount": 0.0,
+            "billing_month": f"2024-{i % 12 + 1:02d}",
+        }
+
+
+_history_dbs = {}
+
+
+def _history_db(n):
+    """Path to a temporary database holding n history records (built once)."""
+    if n not in _history_dbs:
+        from Database.history_db import HistoryStore
+        path = os.path.join(tempfile.mkdtemp(prefix="microbench_"), "history.db")
+        store = HistoryStore(path, batch_size=10000)
+        for record in _records(n):
+            store.add(record)
+        store.close()
+        _history_dbs[n] = path
+    return _history_dbs[n]
+
+
+def _history_page_case(n):
+    def setup():
+        from Database.history_db import HistoryStore
+        from electric_bill_gui import HistoryManager, HISTORY_PAGE_SIZE
+        store = HistoryStore(_history_db(n))
+        middle = n // 2  # a page deep in the history, reached by ID
+        return lambda: "".join(HistoryManager.format_line(r)
+                               for r in store.page(HISTORY_PAGE_SIZE, after_id=middle)), 1
+    return setup
+
+
+def _history_aggregates_case(n):
+    def setup():
+        from Database.history_db import HistoryStore
+        store = HistoryStore(_history_db(n))
+        return store.aggregates, 1
+    return setup
+
+
+def _render_history_case(n):
+    def setup():
+        from tkinter import Tk, TclError
+        from electric_bill_gui import HistoryManager
+        try:
+            root = Tk()
+        except TclError:
+            raise Skip("no display")
+        root.withdraw()
+        manager = HistoryManager(root, _history_db(n))
+
+        def render():
+            manager.render_history()
+            root.update_idletasks()
+        return render, 1
+    return setup
+
+
+for _n in HISTORY_SIZES:
+    _label = f"{_n // 1000}k"
+    case(f"history_page/{_label}")(_history_page_case(_n))
+    case(f"history_aggregates/{_label}")(_history_aggregates_case(_n))
+    case(f"render_history/{_label}")(_render_history_case(_n))
+
+
+# ========== EXPORT WRITERS ==========
+@case("export_csv/10k")
+def _export_csv():
+    from electric_bill_gui import write_csv_header, write_csv_rows
+    records = list(_records(WRITER_RECORDS))
+
+    def write():
+        f = io.StringIO(newline="")
+        write_csv_header(f)
+        write_csv_rows(f, records)
+    return write, len(records)
+
+
+@case("export_txt/10k")
+def _export_txt():
+    from electric_bill_gui import write_txt_rows
+    records = list(_records(WRITER_RECORDS))
+    return lambda: write_txt_rows(io.StringIO(), records), len(records)
+
+
+# ========== PDF ==========
+@case("generate_bill_pdf")
+def _generate_bill_pdf():
+    from pdf_maker import generate_bill_pdf
+    data = {"name": "Juan Dela Cruz", "account": "ACC-0000001", "address": "Manila",
+            "type": "Residential", "month": "2024-01", "kwh": 250.0, "rate": "8.00",
+            "fixed": "40.00", "base": "1525.00", "env": "3.81", "vat": "183.00",
+            "total": "1751.81"}
+    return lambda: generate_bill_pdf(data, io.BytesIO()), 1
+
+
+# ========== LOGIN ==========
+def _login_case(known):
+    def setup():
+        from Database import db_utils
+        from Database.connection_pool import ConnectionPool
+        path = os.path.join(tempfile.mkdtemp(prefix="microbench_"), "accounts.db")
+        pool = ConnectionPool(path)
+        with pool.connection() as conn:
+            db_utils.ensure_table(conn)
+            db_utils.add_user(conn, "Bench", "User", "bench@example.com", "correct horse")
+        email = "bench@example.com" if known else "nobody@example.com"
+
+        def login():
+            with pool.connection() as conn:
+                db_utils.verify_user(conn, email, "correct horse")
+        return login, 1
+    return setup
+
+
+case("login/verify")(_login_case(True))
+case("login/unknown_user")(_login_case(False))
+
+
+# ========== RUN / COMPARE ==========
+def _git_commit():
+    proc = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                          capture_output=True, text=True)
+    return proc.stdout.strip() or None
+
+
+def run(filters=()):
+    """Time every case whose name contains one of filters (all if empty)."""
+    results = {}
+    for name, setup in CASES.items():
+        if filters and not any(f in name for f in filters):
+            continue
+        try:
+            fn, ops = setup()
+        except Skip as e:
+            print(f"{name:<32} skipped ({e})")
+            continue
+        results[name] = measure(fn, ops)
+        print(f"{name:<32} {results[name]['best'] * 1e6:12.2f} us/op", flush=True)
+    return {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+
+def compare(base, new, threshold=0.10):
+    """Return [(name, base s/op, new s/op, change)] and the regressions among them."""
+    rows, regressions = [], []
+    for name, result in new["results"].items():
+        if name not in base["results"]:
+            continue
+        old = base["results"][name]["best"]
+        change = result["best"] / old - 1 if old else 0.0
+        rows.append((name, old, result["best"], change))
+        if change > threshold:
+            regressions.append(name)
+    return rows, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run or compare the microbenchmarks.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run_parser = sub.add_parser("run", help="run the benchmarks and save the results")
+    run_parser.add_argument("-o", "--output", default=None,
+                            help="JSON file to write (default: results-<time>.json in the current directory)")
+    run_parser.add_argument("-k", dest="filters", action="append", default=[],
+                            help="only run cases whose name contains this (repeatable)")
+    compare_parser = sub.add_parser("compare", help="compare two saved runs")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=0.10,
+                                help="slowdown that counts as a regression (default: 0.10)")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        data = run(args.filters)
+        output = args.output or f"results-{time.strftime('%Y%m%d-%H%M%S')}.json"
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        print(f"Saved {len(data['results'])} results to {output}")
+        return 0
+
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.new, encoding="utf-8") as f:
+        new = json.load(f)
+    rows, regressions = compare(base, new, args.threshold)
+    for name, old, current, change in rows:
+        flag = "  REGRESSION" if name in regressions else ""
+        print(f"{name:<32} {old * 1e6:12.2f} -> {current * 1e6:12.2f} us/op {change:+8.1%}{flag}")
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+        return 1
+    print(f"No regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
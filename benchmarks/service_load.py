@@ -0,0 +1,102 @@
+"""service_load.py
+
+Load-test client for billing_service.py. Opens a number of keep-alive
+connections, sends quote (or PDF) requests over all of them at once, and
+reports p50/p99 latency and requests per second.
+
+Usage:
+    python billing_service.py &
+    python benchmarks/service_load.py [--requests N] [--concurrency N] [--pdf]
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+
+PDF_FIELDS = {"name": "Load Test", "account": "LT-0001", "address": "Localhost",
+              "discount": "None", "month": "January"}
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def _worker(host, port, path, count, latencies, errors, rng):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for _ in range(count):
+            payload = {"kwh": rng.randint(0, 1500), "senior": rng.random() < 0.3,
+                       "type": rng.choice(("residential", "commercial"))}
+            if path == "/pdf":
+                payload.update(PDF_FIELDS)
+            body = json.dumps(payload).encode()
+            start = time.perf_counter()
+            writer.write(f"POST {path} HTTP/1.1\r\nHost: {host}\r\n"
+                         f"Content-Type: application/json\r\n"
+                         f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+            await writer.drain()
+
+            status = int((await reader.readline()).split()[1])
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                if name.lower() == "content-length":
+                    length = int(value)
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def run_load(host, port, path, requests, concurrency, seed=0):
+    """Return (latencies in seconds, error statuses, elapsed seconds)."""
+    latencies, errors = [], []
+    rng = random.Random(seed)
+    share, extra = divmod(requests, concurrency)
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        _worker(host, port, path, share + (i < extra), latencies, errors, rng)
+        for i in range(concurrency)))
+    return latencies, errors, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the local billing service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--requests", type=int, default=20000, help="total requests to send")
+    parser.add_argument("--concurrency", type=int, default=64, help="parallel connections")
+    parser.add_argument("--pdf", action="store_true", help="hit /pdf instead of /quote")
+    args = parser.parse_args(argv)
+
+    path = "/pdf" if args.pdf else "/quote"
+    try:
+        latencies, errors, elapsed = asyncio.run(
+            run_load(args.host, args.port, path, args.requests, args.concurrency))
+    except OSError as e:
+        print(f"Error: cannot reach service: {e}", file=sys.stderr)
+        return 1
+
+    latencies.sort()
+    print(f"{len(latencies)} {path} requests, {args.concurrency} connections, "
+          f"{elapsed:.2f}s: {len(latencies) / elapsed:,.0f} req/s")
+    print(f"  p50 {percentile(latencies, 0.50) * 1000:.2f} ms   "
+          f"p99 {percentile(latencies, 0.99) * 1000:.2f} ms   "
+          f"max {latencies[-1] * 1000 if latencies else 0:.2f} ms")
+    if errors:
+        print(f"  {len(errors)} non-200 responses")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
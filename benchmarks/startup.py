@@ -0,0 +1,133 @@
+"""startup.py
+
+Startup benchmark: summarises ``python -X importtime`` for the modules the
+login screen needs, checks that none of the heavy optional dependencies
+are pulled in on the way, and times the wall clock from process launch to
+the first paint of the login window (needs a display). It also checks
+that the pricing and bulk modules load without Tk, so workers and
+services can use them on headless machines.
+
+Usage:
+    python benchmarks/startup.py [--max-import-ms N] [--max-login-ms N]
+
+Exits with status 1 if a heavy module is imported at startup or a limit
+is exceeded, so it can guard against regressions.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# What a user who only logs in should load
+STARTUP_MODULES = ("accountsystem", "login_page", "electric_bill_gui")
+
+# Modules that must only load on first use
+HEAVY_MODULES = ("pandas", "numpy", "reportlab", "tkcalendar", "pdf_maker")
+
+# Modules used by workers and scripts, and the GUI modules they must not load
+HEADLESS_MODULES = ("billing_core", "batch_billing", "fixed_point", "bulk_billing")
+GUI_MODULES = ("tkinter", "electric_bill_gui")
+
+_LOGIN_SCRIPT = """
+import time
+from tkinter import Tk
+from login_page import build_login_frame
+root = Tk()
+build_login_frame(root, "Database/AccountSystem.db").pack(fill='both', expand=True)
+root.after_idle(lambda: (print(time.time()), root.destroy()))
+root.mainloop()
+"""
+
+
+def _run(args):
+    return subprocess.run([sys.executable, *args], cwd=ROOT, capture_output=True, text=True)
+
+
+def import_times(modules=STARTUP_MODULES, top=10):
+    """Return (total ms, [(module, cumulative ms)] slowest first, error)."""
+    proc = _run(["-X", "importtime", "-c", "import " + ", ".join(modules)])
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # nested imports are indented under their importer in the name column
+        nested = name[1:] != name[1:].lstrip()
+        rows.append((name.strip(), int(cumulative) / 1000, nested))
+    # a module imported by another one is already in its cumulative time
+    total = sum(ms for name, ms, nested in rows if name in modules and not nested)
+    rows = [(name, ms) for name, ms, _ in rows]
+    slowest = sorted(rows, key=lambda row: row[1], reverse=True)[:top]
+    error = proc.stderr.strip().splitlines()[-1] if proc.returncode else None
+    return total, slowest, error
+
+
+def heavy_imports(modules=STARTUP_MODULES, forbidden=HEAVY_MODULES):
+    """Names from forbidden that importing modules loads."""
+    proc = _run(["-c", f"import sys, {', '.join(modules)}; "
+                       f"print(' '.join(m for m in {forbidden!r} if m in sys.modules))"])
+    if proc.returncode:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    return proc.stdout.split()
+
+
+def time_to_login():
+    """Milliseconds from launching Python to the login window's first paint."""
+    start = time.time()
+    proc = _run(["-c", _LOGIN_SCRIPT])
+    if proc.returncode:
+        return None
+    return (float(proc.stdout.strip().splitlines()[-1]) - start) * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure startup import cost and time to login window.")
+    parser.add_argument("--max-import-ms", type=float, default=None,
+                        help="fail if importing the startup modules takes longer")
+    parser.add_argument("--max-login-ms", type=float, default=None,
+                        help="fail if the login window takes longer to paint")
+    args = parser.parse_args(argv)
+    failed = False
+
+    total, slowest, error = import_times()
+    if error:
+        print(f"Import failed: {error}")
+        return 1
+    print(f"Startup imports: {total:.1f} ms cumulative")
+    for name, ms in slowest:
+        print(f"  {ms:8.1f} ms  {name}")
+    if args.max_import_ms is not None and total > args.max_import_ms:
+        print(f"FAIL: imports took {total:.1f} ms (limit {args.max_import_ms:.1f} ms)")
+        failed = True
+
+    heavy = heavy_imports()
+    if heavy:
+        print(f"FAIL: heavy modules loaded at startup: {', '.join(heavy)}")
+        failed = True
+    else:
+        print("No heavy modules loaded at startup")
+
+    gui = heavy_imports(HEADLESS_MODULES, GUI_MODULES)
+    if gui:
+        print(f"FAIL: headless modules load the GUI: {', '.join(gui)}")
+        failed = True
+    else:
+        print("Headless modules load without Tk")
+
+    login_ms = time_to_login()
+    if login_ms is None:
+        print("Time to login window: skipped (no display)")
+    else:
+        print(f"Time to login window: {login_ms:.0f} ms")
+        if args.max_login_ms is not None and login_ms > args.max_login_ms:
+            print(f"FAIL: login window took {login_ms:.0f} ms (limit {args.max_login_ms:.0f} ms)")
+            failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,46 @@
+"""billing_core.py
+
+Pricing functions with no GUI dependencies, so worker processes, scripts
+and services can price a reading without importing Tk. electric_bill_gui
+re-exports them for existing callers.
+"""
+from tariffs import current_tariff, price_units, schedule_for
+
+
+def tiered(u, tiers):
+    cost = 0
+    applied_rates = 0
+    for limits, rate in tiers:
+        if u <= 0:
+            break
+        use = min(u, limits)
+        cost += use * rate
+        applied_rates = rate
+        u -= use
+    return cost, applied_rates
+
+
+def calculate_bill(units, customer_type, is_senior=False, tariff=None):
+    """Calculate bill with optional senior discount
+
+    tariff: compiled tariff to price with (defaults to the one in effect today)
+    """
+    if tariff is None:
+        tariff = current_tariff()
+    schedule = schedule_for(tariff, customer_type)
+    fixed = schedule.fixed
+
+    energy, applied_rates = price_units(units, schedule)
+    vat = energy * tariff.vat_rate
+    env_fee = energy * tariff.env_fee_rate
+    total = energy + fixed + vat + env_fee
+
+    # Apply discount only for seniors
+    discount_amount = 0
+    if is_senior:
+        discount_amount = total * tariff.senior_discount_rate
+        total = total - discount_amount
+
+    return (round(energy, 2), round(fixed, 2), round(vat, 2),
+            round(env_fee, 2), round(applied_rates, 2),
+            round(total, 2), round(discount_amount, 2))
@@ -0,0 +1,253 @@
+"""billing_service.py
+
+Local HTTP service around the billing engine for the portal and IVR.
+
+    POST /quote  {"kwh": 250, "type": "residential", "senior": false, "month": "2024-03"}
+                 -> JSON with the same amounts calculate_bill returns
+    POST /pdf    {"name", "account", "address", "type", "discount",
+                  "month", "kwh"} (the bulk_billing input columns)
+                 -> the bill receipt as application/pdf
+    GET  /health -> {"status": "ok"}
+
+Built on asyncio streams with no extra dependencies. Quotes that arrive
+close together are gathered into one micro-batch and priced in a single
+calculate_bills pass per tariff. Each request is priced with the tariff in
+effect on its "month" (see tariffs.tariff_for_month), as bulk_billing
+does; without one, today's tariff applies. PDFs are rendered in a process pool so the event
+loop never blocks on ReportLab.
+
+Usage:
+    python billing_service.py [--host 127.0.0.1] [--port 8765] [--pdf-workers N]
+"""
+import argparse
+import asyncio
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+
+from batch_billing import calculate_bills
+from bulk_billing import is_senior_discount, parse_kwh
+from tariffs import current_tariff, tariff_for_month
+
+HOST = "127.0.0.1"
+PORT = 8765
+MAX_BATCH = 256  # quotes priced per pass at most
+BATCH_DELAY_MS = 2  # how long the first quote in a batch waits for company
+MAX_BODY = 64 * 1024
+QUOTE_KEYS = ("energy", "fixed", "vat", "env", "rate", "total", "discount")
+
+
+class RequestError(Exception):
+    """Bad request from a client; becomes an HTTP error response."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# ========== MICRO-BATCHING ==========
+class QuoteBatcher:
+    """Collect concurrent quotes and price each batch with calculate_bills."""
+
+    def __init__(self, max_batch=MAX_BATCH, delay_ms=BATCH_DELAY_MS):
+        self.max_batch = max_batch
+        self.delay = delay_ms / 1000
+        self._pending = []
+        self._timer = None
+        self.batches = 0
+        self.quotes = 0
+
+    def quote(self, units, customer_type, is_senior, tariff=None):
+        """Return a future resolving to (tariff version, dict of amounts)."""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((units, customer_type, is_senior, tariff or current_tariff(), future))
+        if len(self._pending) >= self.max_batch:
+            self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.delay, self.flush)
+        return future
+
+    def flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        groups = {}
+        for quote in batch:
+            groups.setdefault(quote[3].version, (quote[3], []))[1].append(quote)
+        for tariff, quotes in groups.values():
+            units, types, senior, _, futures = zip(*quotes)
+            try:
+                results = calculate_bills(units, types, senior, tariff)
+            except Exception as e:
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            columns = [results[k].tolist() for k in QUOTE_KEYS]
+            for i, future in enumerate(futures):
+                if not future.done():
+                    future.set_result((tariff.version, {k: col[i] for k, col in zip(QUOTE_KEYS, columns)}))
+        self.batches += 1
+        self.quotes += len(batch)
+
+
+# ========== SERVICE ==========
+def _reading(payload):
+    """(kWh, consumer type, senior, tariff) from a request body."""
+    try:
+        units = parse_kwh(payload.get("kwh"))
+    except ValueError as e:
+        raise RequestError(HTTPStatus.BAD_REQUEST, str(e))
+    customer_type = str(payload.get("type") or "").strip().lower()
+    if "senior" in payload:
+        senior = payload["senior"]
+        if not isinstance(senior, bool):
+            raise RequestError(HTTPStatus.BAD_REQUEST, "senior must be true or false")
+    else:
+        senior = is_senior_discount(payload.get("discount"))
+    return units, customer_type, senior, tariff_for_month(str(payload.get("month") or ""))
+
+
+class BillingService:
+    def __init__(self, pdf_workers=None, max_batch=MAX_BATCH, delay_ms=BATCH_DELAY_MS):
+        self.batcher = QuoteBatcher(max_batch, delay_ms)
+        self.pdf_pool = ProcessPoolExecutor(max_workers=pdf_workers)
+
+    async def quote(self, payload):
+        version, amounts = await self.batcher.quote(*_reading(payload))
+        return {"tariff": version, **amounts}
+
+    async def pdf(self, payload):
+        from pdf_maker import render_bill_pdf
+
+        units, customer_type, senior, tariff = _reading(payload)
+        version, amounts = await self.batcher.quote(units, customer_type, senior, tariff)
+        data = {key: str(payload.get(key, "")) for key in ("name", "account", "address", "type", "discount", "month")}
+        data.update({
+            "kwh": units,
+            "discount_amount": f"{amounts['discount']:.2f}",
+            "rate": f"{amounts['rate']:.2f}",
+            "fixed": f"{amounts['fixed']:.2f}",
+            "base": f"{amounts['energy']:.2f}",
+            "env": f"{amounts['env']:.2f}",
+            "vat": f"{amounts['vat']:.2f}",
+            "total": f"{amounts['total']:.2f}",
+        })
+        return await asyncio.get_running_loop().run_in_executor(self.pdf_pool, render_bill_pdf, data)
+
+    async def dispatch(self, method, path, body):
+        """Return (status, content type, body bytes) for one request."""
+        if path == "/health":
+            return HTTPStatus.OK, "application/json", b'{"status": "ok"}'
+        routes = {"/quote": self.quote, "/pdf": self.pdf}
+        handler = routes.get(path)
+        if handler is None:
+            raise RequestError(HTTPStatus.NOT_FOUND, f"No such endpoint: {path}")
+        if method != "POST":
+            raise RequestError(HTTPStatus.METHOD_NOT_ALLOWED, "Use POST")
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError:
+            raise RequestError(HTTPStatus.BAD_REQUEST, "Body must be JSON")
+        if not isinstance(payload, dict):
+            raise RequestError(HTTPStatus.BAD_REQUEST, "Body must be a JSON object")
+
+        result = await handler(payload)
+        if isinstance(result, bytes):
+            return HTTPStatus.OK, "application/pdf", result
+        return HTTPStatus.OK, "application/json", json.dumps(result).encode()
+
+    async def handle(self, reader, writer):
+        """Serve HTTP/1.1 requests on one connection, keeping it alive."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = (headers.get("connection", "").lower() != "close"
+                              and version == "HTTP/1.1")
+                try:
+                    length = int(headers.get("content-length", 0))
+                except ValueError:
+                    length = -1
+                try:
+                    if length < 0:
+                        keep_alive = False  # the body cannot be skipped
+                        raise RequestError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+                    if length > MAX_BODY:
+                        keep_alive = False
+                        raise RequestError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Body too large")
+                    body = await reader.readexactly(length) if length else b""
+                    status, content_type, data = await self.dispatch(method, path.split("?")[0], body)
+                except RequestError as e:
+                    status, content_type = e.status, "application/json"
+                    data = json.dumps({"error": str(e)}).encode()
+                except Exception as e:
+                    status, content_type = HTTPStatus.INTERNAL_SERVER_ERROR, "application/json"
+                    data = json.dumps({"error": f"{type(e).__name__}: {e}"}).encode()
+
+                writer.write(
+                    f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                    f"Content-Type: {content_type}\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode()
+                    + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host=HOST, port=PORT):
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"Billing service listening on http://{host}:{port}", flush=True)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.pdf_pool.shutdown(cancel_futures=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve bill quotes and PDFs over local HTTP.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--pdf-workers", type=int, default=None,
+                        help="processes rendering PDFs (defaults to the CPU count)")
+    parser.add_argument("--batch-size", type=int, default=MAX_BATCH,
+                        help=f"most quotes priced in one pass (default: {MAX_BATCH})")
+    parser.add_argument("--batch-delay-ms", type=float, default=BATCH_DELAY_MS,
+                        help=f"longest a quote waits for a batch to fill (default: {BATCH_DELAY_MS})")
+    args = parser.parse_args(argv)
+
+    service = BillingService(args.pdf_workers, args.batch_size, args.batch_delay_ms)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
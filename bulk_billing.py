@@ -0,0 +1,207 @@
+"""bulk_billing.py
+
+Headless month-end billing: streams a CSV of meter readings through the
+billing engine in fixed-size chunks and writes a results CSV. Only one
+chunk is held in memory at a time, so memory stays flat for any file size.
+
+Input columns: name, account, address, type, discount, month, kwh
+
+Each row is priced with the tariff in effect on its billing month (see
+tariffs.tariff_for_month); months without a recognisable date use today's.
+
+Rows whose kWh is not a finite number between 0 and MAX_KWH are skipped
+and reported on stderr as they are found.
+
+Usage:
+    python bulk_billing.py readings.csv bills.csv [--chunk-size N] [--exact]
+
+With --exact, bills are computed in integer centavos (see fixed_point.py).
+"""
+import argparse
+import csv
+import math
+import sys
+import time
+
+from batch_billing import calculate_bills
+from fixed_point import calculate_bills_cents, format_cents
+from tariffs import get_registry, tariff_for_month
+
+
+INPUT_FIELDS = ["name", "account", "address", "type", "discount", "month", "kwh"]
+
+# Same keys as the bill dict passed to pdf_maker.generate_bill_pdf
+OUTPUT_FIELDS = ["name", "account", "address", "type", "discount", "discount_amount",
+                 "month", "kwh", "rate", "fixed", "base", "env", "vat", "total"]
+
+SENIOR_DISCOUNT = "Senior Citizen (5%)"
+
+# Largest reading accepted for one bill; anything above is a data error
+MAX_KWH = 1000000
+
+
+def is_senior_discount(value):
+    """Accept the GUI label as well as a bare 'senior' in the input file."""
+    value = (value or "").strip().lower()
+    return value == SENIOR_DISCOUNT.lower() or value == "senior"
+
+
+def _money(value):
+    return f"{value:.2f}"
+
+
+def _group_by_tariff(rows):
+    """{tariff version: (tariff, [row indexes])} from each row's billing month."""
+    registry = get_registry()
+    by_month = {}
+    groups = {}
+    for i, r in enumerate(rows):
+        tariff = by_month.get(r["month"])
+        if tariff is None:
+            tariff = by_month[r["month"]] = tariff_for_month(r["month"], registry)
+        groups.setdefault(tariff.version, (tariff, []))[1].append(i)
+    return groups
+
+
+def _price_rows(rows, exact=False):
+    """Return (energy, fixed, vat, env, rate, total, discount) per row."""
+    groups = _group_by_tariff(rows)
+    engine = calculate_bills_cents if exact else calculate_bills
+    priced = None if len(groups) == 1 else [None] * len(rows)
+    for tariff, indexes in groups.values():
+        group = rows if priced is None else [rows[i] for i in indexes]
+        results = engine(
+            [r["kwh"] for r in group],
+            [r["type"].lower() for r in group],
+            [is_senior_discount(r["discount"]) for r in group],
+            tariff,
+        )
+        bills = list(zip(*(results[k].tolist() for k in
+                           ("energy", "fixed", "vat", "env", "rate", "total", "discount"))))
+        if priced is None:
+            return bills
+        for i, bill in zip(indexes, bills):
+            priced[i] = bill
+    return priced
+
+
+def _price_chunk(rows, exact=False):
+    """Price a list of parsed rows and return the output dicts."""
+    money = format_cents if exact else _money
+    bills = []
+    for r, (energy, fixed, vat, env, rate, total, discount) in zip(rows, _price_rows(rows, exact)):
+        bills.append({
+            "name": r["name"],
+            "account": r["account"],
+            "address": r["address"],
+            "type": r["type"],
+            "discount": r["discount"],
+            "discount_amount": money(discount),
+            "month": r["month"],
+            "kwh": r["kwh"],
+            "rate": money(rate),
+            "fixed": money(fixed),
+            "base": money(energy),
+            "env": money(env),
+            "vat": money(vat),
+            "total": money(total),
+        })
+    return bills
+
+
+def parse_kwh(value):
+    """Return the reading as a float, or raise ValueError if it is not a
+    finite number between 0 and MAX_KWH."""
+    try:
+        kwh = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"invalid kWh value {value!r}")
+    if not math.isfinite(kwh) or kwh < 0 or kwh > MAX_KWH:
+        raise ValueError(f"kWh value {value!r} is outside 0..{MAX_KWH}")
+    return kwh
+
+
+def iter_chunks(reader, chunk_size, on_error=None):
+    """Yield lists of at most chunk_size valid rows.
+
+    Bad rows are passed to on_error(line number, message) and dropped,
+    so nothing about them is kept in memory.
+    """
+    chunk = []
+    for line_no, row in enumerate(reader, start=2):
+        try:
+            row["kwh"] = parse_kwh(row["kwh"])
+        except ValueError as e:
+            if on_error is not None:
+                on_error(line_no, str(e))
+            continue
+        row["type"] = (row.get("type") or "").strip()
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def run_bulk(input_path, output_path, chunk_size=10000, exact=False, on_error=None):
+    """Bill every reading in input_path and write results to output_path.
+
+    exact: price in integer centavos with the fixed-point engine
+    on_error: optional callable(line number, message) for each skipped row
+
+    Returns (rows billed, rows skipped, seconds).
+    """
+    skipped = 0
+    count = 0
+
+    def skip(line_no, message):
+        nonlocal skipped
+        skipped += 1
+        if on_error is not None:
+            on_error(line_no, message)
+
+    start = time.perf_counter()
+    with open(input_path, newline="", encoding="utf-8") as src, \
+            open(output_path, "w", newline="", encoding="utf-8") as dst:
+        reader = csv.DictReader(src)
+        missing = [f for f in INPUT_FIELDS if f not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError(f"Input is missing columns: {', '.join(missing)}")
+
+        writer = csv.DictWriter(dst, fieldnames=OUTPUT_FIELDS)
+        writer.writeheader()
+        for chunk in iter_chunks(reader, chunk_size, skip):
+            writer.writerows(_price_chunk(chunk, exact))
+            count += len(chunk)
+    return count, skipped, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bill a CSV of meter readings without the GUI.")
+    parser.add_argument("input", help="CSV of readings (name, account, address, type, discount, month, kwh)")
+    parser.add_argument("output", help="CSV file to write the bills to")
+    parser.add_argument("--chunk-size", type=int, default=10000,
+                        help="readings priced per batch (default: 10000)")
+    parser.add_argument("--exact", action="store_true",
+                        help="price in integer centavos with the fixed-point engine")
+    args = parser.parse_args(argv)
+
+    def report(line_no, message):
+        print(f"Skipped line {line_no}: {message}", file=sys.stderr)
+
+    try:
+        count, skipped, elapsed = run_bulk(args.input, args.output, args.chunk_size,
+                                           args.exact, on_error=report)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    rate = count / elapsed if elapsed else 0.0
+    print(f"Billed {count} readings in {elapsed:.2f}s ({rate:,.0f} rows/s), "
+          f"{skipped} skipped")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""diagnostics.py
+
+In-app diagnostics panel: a window listing every metrics span (calls,
+errors, mean/p50/p99/max latency) and counter, refreshed once a second.
+Opened with F12 from the account system or the calculator window.
+"""
+from tkinter import Toplevel, Frame, Label, Button, StringVar, LEFT, RIGHT, X, BOTH
+from tkinter import ttk
+
+import metrics
+
+REFRESH_MS = 1000
+COLUMNS = (("span", "Span", 220), ("count", "Calls", 70), ("errors", "Errors", 60),
+           ("mean", "Mean ms", 80), ("p50", "p50 ms", 80), ("p99", "p99 ms", 80),
+           ("max", "Max ms", 80))
+
+
+def open_diagnostics(master):
+    """Show the diagnostics window for master's application (one per root)."""
+    root = master.winfo_toplevel()
+    existing = getattr(root, "_diagnostics_window", None)
+    if existing is not None and existing.winfo_exists():
+        existing.lift()
+        return existing
+
+    win = Toplevel(root)
+    win.title("Diagnostics")
+    win.geometry("720x420")
+    root._diagnostics_window = win
+
+    status = StringVar()
+    top = Frame(win)
+    top.pack(fill=X, padx=10, pady=(10, 5))
+    Label(top, textvariable=status, anchor="w").pack(side=LEFT, fill=X, expand=True)
+
+    def toggle():
+        metrics.enable(not metrics.enabled())
+        refresh(reschedule=False)
+
+    def clear():
+        metrics.reset()
+        refresh(reschedule=False)
+
+    toggle_btn = Button(top, command=toggle, width=10)
+    toggle_btn.pack(side=RIGHT, padx=(5, 0))
+    Button(top, text="Reset", command=clear, width=8).pack(side=RIGHT)
+
+    table = ttk.Treeview(win, columns=[c for c, _, _ in COLUMNS[1:]], show="tree headings")
+    table.heading("#0", text=COLUMNS[0][1])
+    table.column("#0", width=COLUMNS[0][2])
+    for key, title, width in COLUMNS[1:]:
+        table.heading(key, text=title)
+        table.column(key, width=width, anchor="e")
+    table.pack(fill=BOTH, expand=True, padx=10, pady=(0, 10))
+
+    counters = Label(win, anchor="w", justify=LEFT)
+    counters.pack(fill=X, padx=10, pady=(0, 10))
+
+    def refresh(reschedule=True):
+        if not win.winfo_exists():
+            return
+        data = metrics.snapshot()
+        status.set("Recording" if metrics.enabled() else
+                   "Metrics are off (set BILLING_METRICS=1 or press Enable)")
+        toggle_btn.config(text="Disable" if metrics.enabled() else "Enable")
+
+        # Update rows in place so the selection and scroll position survive
+        rows = set(table.get_children())
+        for name, s in data["spans"].items():
+            values = (s["count"], s["errors"], f"{s['mean'] * 1000:.2f}",
+                      f"{s['p50'] * 1000:.2f}", f"{s['p99'] * 1000:.2f}", f"{s['max'] * 1000:.2f}")
+            if name in rows:
+                table.item(name, values=values)
+                rows.discard(name)
+            else:
+                table.insert("", "end", iid=name, text=name, values=values)
+        for name in rows:
+            table.delete(name)
+
+        counters.config(text="   ".join(f"{name}: {value}" for name, value in data["counters"].items())
+                        or "No counters")
+        if reschedule:
+            win.after(REFRESH_MS, refresh)
+
+    refresh()
+    return win
@@ -1,11 +1,14 @@
 ﻿from tkinter import *
 from tkinter import ttk, messagebox, filedialog
-from tkcalendar import DateEntry
 from datetime import datetime
-import pandas as pd
 import csv
+import math
 import os
-from pdf_maker import generate_bill_pdf
+import threading
+import metrics
+from Database.history_db import HistoryStore, COLUMNS as HISTORY_COLUMNS
+from billing_core import tiered, calculate_bill  # re-exported for existing callers
+from tariffs import current_tariff, get_registry
 
 # ========== STYLE CONSTANTS ==========
 BG_COLOR = "#525561"  # Main background
@@ -22,12 +25,269 @@ FONT_BOLD = (FONT_FAMILY, 12, "bold")
 FONT_NORMAL = (FONT_FAMILY, 11)
 FONT_SMALL = (FONT_FAMILY, 10)
 
+DB_PATH = "Database/AccountSystem.db"
+HISTORY_PAGE_SIZE = 200  # records shown per page in the history tab
+HISTORY_FLUSH_MS = 1000  # delay before queued history records are committed
+EXPORT_CHUNK_SIZE = 1000  # records fetched and written per export chunk
+EXPORT_BUFFER_SIZE = 1 << 20  # file buffer for exports
+EXPORT_POLL_MS = 100  # how often the export dialog checks on its worker
+PREVIEW_DELAY_MS = 150  # pause in typing before the bill preview is recomputed
+
+# ========== BACKGROUND EXPORT ==========
+
+class BackgroundExport:
+    """Stream history records to a file on a worker thread.
+
+    The worker opens its own HistoryStore (SQLite connections stay on the
+    thread that made them) and only updates plain attributes; the progress
+    dialog polls them with after(), so Tk is only touched on the UI thread.
+
+    Only rows up to max_id are written, so rows other terminals add while
+    the export runs are left out. Counting them (and, with totals=True,
+    building their HistoryAggregates) is also done by the worker, so a
+    large history never blocks the UI thread.
+
+    write_header(f), write_rows(f, records) and write_footer(f) do the
+    formatting; write_rows receives up to EXPORT_CHUNK_SIZE records at a time.
+    With totals=True the header and footer also get the aggregates:
+    write_header(f, aggregates).
+    """
+
+    def __init__(self, parent, db_path, path, max_id, write_rows,
+                 write_header=None, write_footer=None, newline=None,
+                 kind="history", success_message=None, totals=False):
+        self.db_path = db_path
+        self.path = path
+        self.max_id = max_id
+        self.total = None  # set by the worker once it has counted the rows
+        self.totals = totals
+        self.write_rows = write_rows
+        self.write_header = write_header
+        self.write_footer = write_footer
+        self.newline = newline
+        self.kind = kind
+        self.success_message = success_message or f"History exported to:\n{path}"
+
+        self.done = 0
+        self.error = None
+        self.finished = False
+        self.cancel_event = threading.Event()
+
+        # Progress dialog
+        self.dialog = Toplevel(parent)
+        self.dialog.title(f"Exporting {kind}")
+        self.dialog.configure(bg=CONTAINER_BG)
+        self.dialog.resizable(False, False)
+        self.dialog.protocol("WM_DELETE_WINDOW", self.cancel)
+
+        self.status_label = Label(self.dialog, text="Counting records...",
+                                  font=FONT_NORMAL, fg=TEXT_COLOR, bg=CONTAINER_BG)
+        self.status_label.pack(padx=20, pady=(20, 10))
+
+        self.progress = ttk.Progressbar(self.dialog, length=300, mode="determinate")
+        self.progress.pack(padx=20, pady=(0, 10))
+
+        Button(self.dialog, text="Cancel", command=self.cancel,
+               font=FONT_BOLD, fg=TEXT_COLOR, bg=DANGER_COLOR,
+               relief=FLAT, bd=0, cursor="hand2", activebackground="#FF5252",
+               padx=20, pady=6).pack(pady=(0, 20))
+
+        self.thread = threading.Thread(target=self._timed_run, daemon=True)
+        self.thread.start()
+        self.dialog.after(EXPORT_POLL_MS, self._poll)
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def _timed_run(self):
+        with metrics.span(f"export_write.{self.kind.lower()}"):
+            self._run()
+
+    def _run(self):
+        """Worker thread: page through the history and write it out"""
+        store = HistoryStore(self.db_path)
+        try:
+            extra = ()
+            if self.totals:
+                aggregates = store.aggregates(max_id=self.max_id)
+                self.total = aggregates.count
+                extra = (aggregates,)
+            else:
+                self.total = store.count(self.max_id)
+            with open(self.path, "w", newline=self.newline, encoding="utf-8",
+                      buffering=EXPORT_BUFFER_SIZE) as f:
+                if self.write_header:
+                    self.write_header(f, *extra)
+                chunk = []
+                for record in store.iter_records(page_size=EXPORT_CHUNK_SIZE, max_id=self.max_id):
+                    chunk.append(record)
+                    if len(chunk) >= EXPORT_CHUNK_SIZE:
+                        if self.cancel_event.is_set():
+                            break
+                        self.write_rows(f, chunk)
+                        self.done += len(chunk)
+                        chunk = []
+                if chunk and not self.cancel_event.is_set():
+                    self.write_rows(f, chunk)
+                    self.done += len(chunk)
+                if self.write_footer and not self.cancel_event.is_set():
+                    self.write_footer(f, *extra)
+            if self.cancel_event.is_set():
+                os.remove(self.path)
+        except Exception as e:
+            self.error = e
+        finally:
+            store.conn.close()
+            self.finished = True
+
+    def _poll(self):
+        """UI thread: reflect worker progress and report when it is done"""
+        if self.total is not None:
+            self.progress.config(maximum=max(self.total, 1), value=self.done)
+            self.status_label.config(text=f"{self.done} / {self.total} records")
+        if not self.finished:
+            self.dialog.after(EXPORT_POLL_MS, self._poll)
+            return
+
+        self.dialog.destroy()
+        if self.error is not None:
+            messagebox.showerror("Error", f"Failed to export {self.kind}:\n{str(self.error)}")
+        elif self.cancel_event.is_set():
+            messagebox.showinfo("Cancelled", "Export cancelled.")
+        else:
+            messagebox.showinfo("Success", self.success_message)
+
+def history_dataframe(conn, limit=None, max_id=None):
+    """Load the history table (up to row max_id) into a typed DataFrame for columnar export"""
+    import pandas as pd  # heavy; only needed for columnar export
+
+    columns = ", ".join(col for _, col in HISTORY_COLUMNS)
+    sql = f"SELECT {columns} FROM HistoryDB"
+    if max_id is not None:
+        sql += f" WHERE ID <= {int(max_id)}"
+    sql += " ORDER BY ID"
+    if limit is not None:
+        sql += f" LIMIT {int(limit)}"
+    df = pd.read_sql_query(sql, conn)
+    df.columns = [key for key, _ in HISTORY_COLUMNS]
+    df["timestamp"] = pd.to_datetime(df["timestamp"], format="%Y-%m-%d %H:%M:%S")
+    return df.astype({
+        "customer_name": "string",
+        "account": "string",
+        "kwh_used": "float64",
+        "total_cost": "float64",
+        "customer_type": "category",
+        "discount_value": "category",
+        "discount_amount": "float64",
+        "billing_month": "string",
+    })
+
+
+class ColumnarExport(BackgroundExport):
+    """Write the history as Parquet or Feather (Arrow IPC) on a worker thread"""
+
+    def __init__(self, parent, db_path, path, max_id, kind="Parquet"):
+        super().__init__(parent, db_path, path, max_id, write_rows=None, kind=kind)
+
+    def _run(self):
+        store = HistoryStore(self.db_path)
+        try:
+            self.total = store.count(self.max_id)
+            df = history_dataframe(store.conn, max_id=self.max_id)
+            if self.cancel_event.is_set():
+                return
+            if self.kind == "Parquet":
+                df.to_parquet(self.path, index=False)
+            else:
+                df.to_feather(self.path)
+            self.done = len(df)
+        except Exception as e:
+            self.error = e
+        finally:
+            store.conn.close()
+            self.finished = True
+
+
+# ========== EXPORT WRITERS ==========
+
+def write_txt_rows(f, records):
+    """Write history records as fixed-width rows of the TXT export"""
+    f.write("".join(
+        f"{r['timestamp']:19} {r['customer_name'][:18]:20} {r['account'][:14]:15} "
+        f"{r['kwh_used']:8.2f} ₱{r['total_cost']:10.2f} {r['customer_type'][:8]:>10} "
+        f"{r['discount_value'][:10]:>12} ₱{r['discount_amount']:8.2f}\n"
+        for r in records))
+
+
+def write_txt_header(f, aggregates):
+    f.write("=" * 80 + "\n")
+    f.write("ELECTRIC BILL CALCULATION HISTORY\n")
+    f.write("=" * 80 + "\n\n")
+    f.write(f"Export Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+    f.write(f"Total Records: {aggregates.count}\n")
+    f.write("-" * 80 + "\n\n")
+
+    # Write table header
+    f.write(f"{'Timestamp':19} {'Customer Name':20} {'Account':15} {'kWh':>8} {'Cost':>12} {'Type':>10} {'Discount':>12} {'Disc Amt':>10}\n")
+    f.write("-" * 120 + "\n")
+
+
+def write_txt_footer(f, aggregates):
+    """Write the summary and per type / month breakdowns of the TXT export"""
+    f.write("\n" + "=" * 80 + "\n")
+    f.write("SUMMARY\n")
+    f.write("=" * 80 + "\n")
+    f.write(f"Total Calculations: {aggregates.count}\n")
+    f.write(f"Total kWh Consumed: {aggregates.kwh:.2f}\n")
+    f.write(f"Total Amount: ₱{aggregates.cost:.2f}\n")
+    f.write(f"Total Discounts: ₱{aggregates.discount:.2f}\n")
+
+    # Write breakdowns
+    for title, groups in (("BY CONSUMER TYPE", aggregates.by_type),
+                          ("BY BILLING MONTH", aggregates.by_month)):
+        f.write("\n" + title + "\n")
+        f.write("-" * 80 + "\n")
+        for key in sorted(groups, key=str):
+            totals = groups[key]
+            f.write(f"{str(key)[:20]:20} {totals.count:>8} calcs {totals.kwh:12.2f} kWh "
+                    f"₱{totals.cost:12.2f} ₱{totals.discount:10.2f} disc\n")
+    f.write("=" * 80 + "\n")
+
+
+def write_csv_header(f):
+    csv.writer(f).writerow([
+        "Timestamp", "Customer Name", "Account Number",
+        "kWh Used", "Total Cost", "Customer Type",
+        "Discount Type", "Discount Amount", "Billing Month"
+    ])
+
+
+def write_csv_rows(f, records):
+    """Write history records as rows of the CSV export"""
+    csv.writer(f).writerows(
+        (r['timestamp'], r['customer_name'], r['account'],
+         r['kwh_used'], r['total_cost'], r['customer_type'],
+         r['discount_value'], r['discount_amount'], r['billing_month'])
+        for r in records)
+
+
 # ========== HISTORY MANAGER CLASS ==========
 
 class HistoryManager:
-    def __init__(self, parent_frame):
+    def __init__(self, parent_frame, db_path=DB_PATH):
         self.parent = parent_frame
-        self.session_history = []  # List to store calculation records
+        self.db_path = db_path
+        self.store = HistoryStore(db_path)  # Persistent calculation records
+        self._flush_job = None
+        # Page shown in history_box, by the IDs of its first and last rows
+        self._first_id = self._last_id = None
+        self._at_end = True  # showing the newest rows
+        self._page_rows = 0
+        self._page_number = 1
+        self._total_rows = 0  # from the database at the last render, plus our adds since
+
+        # Running totals, seeded once from the database
+        self.aggregates = self.store.aggregates()
 
         # Create history frame with modern style
         self.history_frame = Frame(parent_frame, bg=CONTAINER_BG, relief=FLAT, borderwidth=2)
@@ -66,6 +326,10 @@ class HistoryManager:
                                   relief=FLAT, borderwidth=2)
         self.summary_label.pack(fill=X, pady=(10, 5))
 
+        # Page navigation
+        nav_frame = Frame(self.history_frame, bg=CONTAINER_BG)
+        nav_frame.pack(pady=(0, 5))
+
         # Buttons frame with modern buttons
         button_frame = Frame(self.history_frame, bg=CONTAINER_BG)
         button_frame.pack(pady=(0, 10))
@@ -89,6 +353,19 @@ class HistoryManager:
             btn.bind("<Leave>", on_leave)
             return btn
 
+        # Page buttons
+        prev_btn = create_modern_button(nav_frame, "◀ Prev",
+                                        self.show_older, ENTRY_BG, ACCENT_COLOR)
+        prev_btn.pack(side=LEFT, padx=5)
+
+        self.page_label = Label(nav_frame, text="Page 1 of 1", font=FONT_SMALL,
+                                fg=TEXT_COLOR, bg=CONTAINER_BG, width=18)
+        self.page_label.pack(side=LEFT, padx=5)
+
+        next_btn = create_modern_button(nav_frame, "Next ▶",
+                                        self.show_newer, ENTRY_BG, ACCENT_COLOR)
+        next_btn.pack(side=LEFT, padx=5)
+
         # Create buttons
         clear_btn = create_modern_button(button_frame, "Clear History",
                                         self.clear_history, DANGER_COLOR, "#FF5252")
@@ -98,10 +375,20 @@ class HistoryManager:
                                          self.export_txt, SUCCESS_COLOR, "#45a049")
         export_btn.pack(side=LEFT, padx=5)
 
+        columnar_btn = create_modern_button(button_frame, "Export Parquet",
+                                            self.export_columnar, "#9B59B6", "#8E44AD")
+        columnar_btn.pack(side=LEFT, padx=5)
+
         refresh_btn = create_modern_button(button_frame, "Refresh",
-                                          self.render_history, ACCENT_COLOR, BUTTON_HOVER)
+                                          self.refresh, ACCENT_COLOR, BUTTON_HOVER)
         refresh_btn.pack(side=LEFT, padx=5)
 
+        # Commit anything still queued when the tab goes away
+        self.history_frame.bind("<Destroy>", lambda e: self.store.close()
+                                if e.widget is self.history_frame else None)
+
+        self.render_history()
+
     def add_calculation(self, customer_name, account, kwh_used, total_cost, customer_type,
                        discount_value, discount_amount, billing_month):
         """Add a new calculation to history"""
@@ -117,18 +404,109 @@ class HistoryManager:
             'discount_amount': discount_amount,
             'billing_month': billing_month
         }
-        self.session_history.append(record)
+        self.store.add(record)
+        self._total_rows += 1
+        if self._flush_job is None:
+            self._flush_job = self.history_frame.after(HISTORY_FLUSH_MS, self._flush)
+
+        self.aggregates.add(record)
+        self.update_summary()
+
+        # Only touch the text widget when the new record is on screen
+        if not self._at_end:
+            self.update_page_label()
+        elif 0 < self._page_rows < HISTORY_PAGE_SIZE:
+            self._page_rows += 1
+            self.append_line(record)
+        else:
+            self.render_history()
+
+    def _flush(self):
+        """Commit queued records in one transaction"""
+        self._flush_job = None
+        self.store.flush()
+
+    def start_export(self, path, write_rows, **kwargs):
+        """Write the history as it is now to path on a background thread"""
+        # MAX(ID) is a single index lookup; it also flushes, as the worker
+        # reads through its own connection
+        return BackgroundExport(self.parent, self.db_path, path, self.store.max_id(),
+                                write_rows, **kwargs)
+
+    @staticmethod
+    def format_line(r):
+        """Format one record as a history row"""
+        # Truncate long names/accounts
+        name_display = r['customer_name'][:14] if len(r['customer_name']) > 14 else r['customer_name']
+        account_display = r['account'][:11] if len(r['account']) > 11 else r['account']
+        discount_type = r['discount_value'][:5] if r['discount_value'] != "None" else "None"
+
+        return f"{r['timestamp']:19} {name_display:15} {account_display:12} " \
+               f"{r['kwh_used']:6.2f} ₱{r['total_cost']:9.2f} {r['customer_type'][:8]:>10} " \
+               f"{discount_type:>8} ₱{r['discount_amount']:8.2f}\n"
+
+    def append_line(self, record):
+        """Add a single record to the end of the visible page"""
+        self.history_box.configure(state="normal")
+        self.history_box.insert(END, self.format_line(record))
+        self.history_box.configure(state="disabled")
+        self.history_box.see(END)
+        self.update_page_label()
+
+    def update_summary(self):
+        self.summary_label.config(
+            text=f"Total Calculations: {self.aggregates.count} | "
+                 f"Total kWh: {self.aggregates.kwh:.2f} | "
+                 f"Total Cost: ₱{self.aggregates.cost:.2f}"
+        )
+
+    def update_page_label(self):
+        pages = max(1, math.ceil(self._total_rows / HISTORY_PAGE_SIZE))
+        page = pages if self._at_end else min(self._page_number, pages)
+        self.page_label.config(text=f"Page {page} of {pages}")
+
+    def show_older(self):
+        """Display the page before the one shown"""
+        if self._first_id is not None:
+            records = self.store.page(HISTORY_PAGE_SIZE, before_id=self._first_id)
+            if records:
+                self.render_history(records)
+
+    def show_newer(self):
+        """Display the page after the one shown"""
+        if self._last_id is not None and not self._at_end:
+            records = self.store.page(HISTORY_PAGE_SIZE, after_id=self._last_id)
+            if records:
+                self.render_history(records)
+
+    def refresh(self):
+        """Reload totals from the database and jump to the newest page"""
+        self.aggregates = self.store.aggregates()
         self.render_history()
 
-    def render_history(self):
-        """Update the history display"""
+    def render_history(self, records=None):
+        """Rebuild the history display for a page of records (the newest if None)"""
+        if records is None:
+            records = self.store.page(HISTORY_PAGE_SIZE)
+        # Counts come from the database, so rows other terminals added show up
+        self._total_rows = self.store.count()
+        if records:
+            self._first_id, self._last_id = records[0]["id"], records[-1]["id"]
+            self._at_end = self._last_id >= self.store.max_id()
+            self._page_number = max(1, math.ceil(self.store.count(self._last_id) / HISTORY_PAGE_SIZE))
+        else:
+            self._first_id = self._last_id = None
+            self._at_end = True
+        self._page_rows = len(records)
+
         self.history_box.configure(state="normal")
         self.history_box.delete("1.0", END)
+        self.update_summary()
+        self.update_page_label()
 
-        if not self.session_history:
+        if not records:
             self.history_box.insert(END, "No calculation history yet.\n")
             self.history_box.insert(END, "Generate some bills to see them here.")
-            self.summary_label.config(text="Total Calculations: 0 | Total kWh: 0.00 | Total Cost: ₱0.00")
             self.history_box.configure(state="disabled")
             return
 
@@ -138,34 +516,15 @@ class HistoryManager:
         lines = [header]
 
         # Add each record
-        for r in self.session_history:
-            # Truncate long names/accounts
-            name_display = r['customer_name'][:14] if len(r['customer_name']) > 14 else r['customer_name']
-            account_display = r['account'][:11] if len(r['account']) > 11 else r['account']
-            discount_type = r['discount_value'][:5] if r['discount_value'] != "None" else "None"
-
-            line = f"{r['timestamp']:19} {name_display:15} {account_display:12} " \
-                   f"{r['kwh_used']:6.2f} ₱{r['total_cost']:9.2f} {r['customer_type'][:8]:>10} " \
-                   f"{discount_type:>8} ₱{r['discount_amount']:8.2f}\n"
-            lines.append(line)
+        lines.extend(self.format_line(r) for r in records)
 
         self.history_box.insert("1.0", "".join(lines))
         self.history_box.configure(state="disabled")
-
-        # Update summary
-        total_kwh = sum(r["kwh_used"] for r in self.session_history)
-        total_cost = sum(r["total_cost"] for r in self.session_history)
-        total_calc = len(self.session_history)
-
-        self.summary_label.config(
-            text=f"Total Calculations: {total_calc} | "
-                 f"Total kWh: {total_kwh:.2f} | "
-                 f"Total Cost: ₱{total_cost:.2f}"
-        )
+        self.history_box.see(END)
 
     def export_txt(self):
         """Export history to TXT file with formatted output"""
-        if not self.session_history:
+        if not self.aggregates.count:
             messagebox.showinfo("No Data", "No calculation history to export.")
             return
 
@@ -182,101 +541,127 @@ class HistoryManager:
         if not path:
             return
 
-        try:
-            with open(path, "w", encoding="utf-8") as f:
-                # Write header
-                f.write("=" * 80 + "\n")
-                f.write("ELECTRIC BILL CALCULATION HISTORY\n")
-                f.write("=" * 80 + "\n\n")
-                f.write(f"Export Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write(f"Total Records: {len(self.session_history)}\n")
-                f.write("-" * 80 + "\n\n")
-
-                # Write table header
-                f.write(f"{'Timestamp':19} {'Customer Name':20} {'Account':15} {'kWh':>8} {'Cost':>12} {'Type':>10} {'Discount':>12} {'Disc Amt':>10}\n")
-                f.write("-" * 120 + "\n")
-
-                # Write each record
-                for r in self.session_history:
-                    f.write(f"{r['timestamp']:19} {r['customer_name'][:18]:20} {r['account'][:14]:15} "
-                           f"{r['kwh_used']:8.2f} ₱{r['total_cost']:10.2f} {r['customer_type'][:8]:>10} "
-                           f"{r['discount_value'][:10]:>12} ₱{r['discount_amount']:8.2f}\n")
-
-                # Write summary
-                f.write("\n" + "=" * 80 + "\n")
-                f.write("SUMMARY\n")
-                f.write("=" * 80 + "\n")
-                total_kwh = sum(r["kwh_used"] for r in self.session_history)
-                total_cost = sum(r["total_cost"] for r in self.session_history)
-                f.write(f"Total Calculations: {len(self.session_history)}\n")
-                f.write(f"Total kWh Consumed: {total_kwh:.2f}\n")
-                f.write(f"Total Amount: ₱{total_cost:.2f}\n")
-                f.write("=" * 80 + "\n")
-
-            messagebox.showinfo("Success", f"History exported to:\n{path}")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to export TXT:\n{str(e)}")
+        # Timed from here so the save dialog is not counted
+        with metrics.span("export_txt"):
+            self.start_export(path, write_txt_rows, write_header=write_txt_header,
+                              write_footer=write_txt_footer, kind="TXT", totals=True)
 
-    def clear_history(self):
-        """Clear all history records"""
-        if not self.session_history:
+    def export_columnar(self):
+        """Export history to Parquet or Feather/Arrow for analytics"""
+        if not self.aggregates.count:
+            messagebox.showinfo("No Data", "No calculation history to export.")
             return
 
-        if messagebox.askyesno("Clear History", "Are you sure you want to clear all calculation history?"):
-            self.session_history.clear()
-            self.render_history()
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        path = filedialog.asksaveasfilename(
+            defaultextension=".parquet",
+            initialfile=f"electric_bill_history_{timestamp}.parquet",
+            filetypes=[("Parquet Files", "*.parquet"),
+                       ("Feather/Arrow Files", "*.feather *.arrow"),
+                       ("All Files", "*.*")]
+        )
 
-    def get_session_history(self):
-        """Get the session history for CSV export"""
-        return self.session_history
-
-
-# ========== ELECTRIC BILL FUNCTIONS ==========
-def tiered(u, tiers):
-    cost = 0
-    applied_rates = 0
-    for limits, rate in tiers:
-        if u <= 0:
-            break
-        use = min(u, limits)
-        cost += use * rate
-        applied_rates = rate
-        u -= use
-    return cost, applied_rates
-
-def calculate_bill(units, customer_type, is_senior=False):
-    """Calculate bill with optional senior discount"""
-    if customer_type == "residential":
-        tiers = [
-            (50, 5.0),
-            (50, 6.5),
-            (100, 8.0),
-            (float("inf"), 10.0),
-        ]
-        fixed = 40
-    else:
-        tiers = [
-            (100, 3.5),
-            (200, 5.0),
-            (500, 6.5),
-            (float("inf"), 7.5),
-        ]
-        fixed = 100
-
-    energy, applied_rates = tiered(units, tiers)
-    vat = energy * 0.12
-    env_fee = energy * 0.0025
-    total = energy + fixed + vat + env_fee
-
-    # Apply discount only for seniors
-    discount_amount = 0
+        if not path:
+            return
+
+        kind = "Feather" if os.path.splitext(path)[1].lower() in (".feather", ".arrow") else "Parquet"
+        ColumnarExport(self.parent, self.db_path, path, self.store.max_id(), kind)
+
+    def clear_history(self):
+        """Clear the records made in this session"""
+        if not self.aggregates.count:
+            return
+
+        if messagebox.askyesno("Clear History",
+                               "Clear the calculations made in this session?\n"
+                               "History saved by other sessions is kept."):
+            self.store.clear()
+            self.refresh()
+
+
+# ========== BILL STATEMENT ==========
+def statement_lines(name, account, address, customer_type, discount_value,
+                    billing_month, units, bill, is_senior):
+    """Lines of the bill statement shown in the output box"""
+    energy, fixed, vat, env_fee, applied_rates, total, discount_amount = bill
+    lines = [
+        "=" * 50 + "\n",
+        "ELECTRIC BILL STATEMENT\n",
+        "=" * 50 + "\n",
+        "\n",
+        f"Customer Name: {name}\n",
+        f"Account Number: {account}\n",
+        f"Address: {address}\n",
+        f"Consumer Type: {customer_type}\n",
+        f"Discount Applied: {discount_value}\n",
+        f"Billing Month: {billing_month}\n",
+        "-" * 40 + "\n",
+        f"Total kWh Used: {units} kWh\n",
+        f"kWh Rate: ₱{applied_rates}/kWh\n",
+        f"Fixed Fee: ₱{fixed:.2f}\n",
+        f"Base Charge: ₱{energy:.2f}\n",
+        f"Environmental Fee: ₱{env_fee:.2f}\n",
+        f"VAT (12%): ₱{vat:.2f}\n",
+    ]
+
+    # Show discount if applied
     if is_senior:
-        discount_amount = total * 0.05  # 5% discount
-        total = total - discount_amount
+        lines.append(f"Senior Discount (5%): -₱{discount_amount:.2f}\n")
+
+    lines.append("-" * 40 + "\n")
+    lines.append(f"TOTAL AMOUNT DUE: ₱{total:.2f}\n")
+    lines.append("=" * 50 + "\n")
+    return lines
+
+
+class StatementView:
+    """Keeps a read-only Text widget in sync with a list of lines,
+    rewriting only the lines that changed since the last update."""
+
+    def __init__(self, text):
+        self.text = text
+        self.lines = []
+
+    def show(self, lines):
+        old = self.lines
+        if old is None:
+            changes = [(0, None, lines)]
+        elif len(old) == len(lines):
+            changes = [(i, i + 1, [new]) for i, new in enumerate(lines) if old[i] != new]
+        else:
+            # Keep the common head and tail, replace what lies between
+            head = 0
+            while head < min(len(old), len(lines)) and old[head] == lines[head]:
+                head += 1
+            tail = 0
+            while (tail < min(len(old), len(lines)) - head
+                   and old[-1 - tail] == lines[-1 - tail]):
+                tail += 1
+            changes = [(head, len(old) - tail, lines[head:len(lines) - tail])]
+        if not changes:
+            return
+
+        self.text.config(state='normal')
+        for start, stop, new in changes:
+            self.text.delete(f"{start + 1}.0", END if stop is None else f"{stop + 1}.0")
+            self.text.insert(f"{start + 1}.0", "".join(new))
+        self.text.config(state='disabled')
+        self.lines = list(lines)
+
+    def message(self, text):
+        """Replace the statement with a single message"""
+        self.show([text if text.endswith("\n") else text + "\n"])
+
+    def append(self, text):
+        """Add text after the statement; the next show() redraws everything"""
+        self.text.config(state='normal')
+        self.text.insert(END, text)
+        self.text.config(state='disabled')
+        self.lines = None
+
+    def clear(self):
+        self.show([])
 
-    return (round(energy, 2), round(fixed, 2), round(vat, 2),
-            round(env_fee, 2), round(applied_rates, 2),
-            round(total, 2), round(discount_amount, 2))
 
 # ========== MODERN STYLED ENTRY FIELD ==========
 def create_modern_entry(parent, label_text, row):
@@ -357,9 +742,11 @@ def create_modern_button(parent, text, command, bg_color=BUTTON_BG, hover_color=
     btn.bind("<Leave>", on_leave)
     return btn
 
-def open_main_app(parent=None, on_logout=None):
+def open_main_app(parent=None, on_logout=None, db_path=DB_PATH):
     """
     Open the main electric bill calculator application.
+
+    db_path: SQLite file the calculation history is persisted to
     """
     if parent is None:
         win = Tk()
@@ -421,7 +808,7 @@ def open_main_app(parent=None, on_logout=None):
     notebook.add(history_frame, text="History")
 
     # Initialize History Manager
-    history_manager = HistoryManager(history_frame)
+    history_manager = HistoryManager(history_frame, db_path)
 
     # ========== CALCULATOR TAB LAYOUT ==========
     # Main container for calculator - using grid
@@ -477,8 +864,10 @@ def open_main_app(parent=None, on_logout=None):
 
     name_entry_frame = Frame(scrollable_frame, bg=CONTAINER_BG)
     name_entry_frame.pack(fill=X, pady=(0, 10), padx=20)
+    name_var = StringVar()
     name_entry = Entry(name_entry_frame, font=FONT_NORMAL, fg=TEXT_COLOR,
-                      bg=ENTRY_BG, relief=FLAT, bd=0, insertbackground=TEXT_COLOR)
+                      bg=ENTRY_BG, relief=FLAT, bd=0, insertbackground=TEXT_COLOR,
+                      textvariable=name_var)
     name_entry.pack(fill=X, ipady=8, ipadx=10)
     Frame(name_entry_frame, height=2, bg=ACCENT_COLOR).pack(fill=X)
 
@@ -489,8 +878,10 @@ def open_main_app(parent=None, on_logout=None):
 
     acc_entry_frame = Frame(scrollable_frame, bg=CONTAINER_BG)
     acc_entry_frame.pack(fill=X, pady=(0, 10), padx=20)
+    acc_var = StringVar()
     acc_entry = Entry(acc_entry_frame, font=FONT_NORMAL, fg=TEXT_COLOR,
-                     bg=ENTRY_BG, relief=FLAT, bd=0, insertbackground=TEXT_COLOR)
+                     bg=ENTRY_BG, relief=FLAT, bd=0, insertbackground=TEXT_COLOR,
+                     textvariable=acc_var)
     acc_entry.pack(fill=X, ipady=8, ipadx=10)
     Frame(acc_entry_frame, height=2, bg=ACCENT_COLOR).pack(fill=X)
 
@@ -501,8 +892,10 @@ def open_main_app(parent=None, on_logout=None):
 
     addr_entry_frame = Frame(scrollable_frame, bg=CONTAINER_BG)
     addr_entry_frame.pack(fill=X, pady=(0, 10), padx=20)
+    addr_var = StringVar()
     addr_entry = Entry(addr_entry_frame, font=FONT_NORMAL, fg=TEXT_COLOR,
-                      bg=ENTRY_BG, relief=FLAT, bd=0, insertbackground=TEXT_COLOR)
+                      bg=ENTRY_BG, relief=FLAT, bd=0, insertbackground=TEXT_COLOR,
+                      textvariable=addr_var)
     addr_entry.pack(fill=X, ipady=8, ipadx=10)
     Frame(addr_entry_frame, height=2, bg=ACCENT_COLOR).pack(fill=X)
 
@@ -555,8 +948,11 @@ def open_main_app(parent=None, on_logout=None):
     month_frame = Frame(scrollable_frame, bg=CONTAINER_BG)
     month_frame.pack(fill=X, pady=(0, 10), padx=20)
 
+    from tkcalendar import DateEntry  # deferred until the billing screen is built
+    month_var = StringVar()
     month_entry = DateEntry(month_frame, width=33, background='darkblue',
-                           foreground='white', borderwidth=0, font=FONT_NORMAL)
+                           foreground='white', borderwidth=0, font=FONT_NORMAL,
+                           textvariable=month_var)
     month_entry.pack(fill=X, ipady=8)
 
     # kWh Used
@@ -566,8 +962,10 @@ def open_main_app(parent=None, on_logout=None):
 
     units_entry_frame = Frame(scrollable_frame, bg=CONTAINER_BG)
     units_entry_frame.pack(fill=X, pady=(0, 10), padx=20)
+    units_var = StringVar()
     units_entry = Entry(units_entry_frame, font=FONT_NORMAL, fg=TEXT_COLOR,
-                       bg=ENTRY_BG, relief=FLAT, bd=0, insertbackground=TEXT_COLOR)
+                       bg=ENTRY_BG, relief=FLAT, bd=0, insertbackground=TEXT_COLOR,
+                       textvariable=units_var)
     units_entry.pack(fill=X, ipady=8, ipadx=10)
     Frame(units_entry_frame, height=2, bg=ACCENT_COLOR).pack(fill=X)
 
@@ -610,6 +1008,7 @@ def open_main_app(parent=None, on_logout=None):
                          activebackground=ACCENT_COLOR)
     scrollbar.pack(side=RIGHT, fill=Y)
     output_box.config(yscrollcommand=scrollbar.set)
+    statement = StatementView(output_box)
 
     # Buttons Frame
     button_frame = Frame(right_container, bg=CONTAINER_BG)
@@ -654,20 +1053,27 @@ def open_main_app(parent=None, on_logout=None):
         discount_combo.current(0)
 
         # Clear output box
-        output_box.config(state='normal')
-        output_box.delete("1.0", END)
-        output_box.config(state='disabled')
+        cancel_preview()
+        statement.clear()
 
         # Set focus to first field
         name_entry.focus_set()
 
-    def generate_bill():
-        name = name_entry.get()
-        account = acc_entry.get()
-        address = addr_entry.get()
+    # ========== LIVE PREVIEW ==========
+    preview_job = {"id": None}
+
+    def billing_tariff():
+        """Tariff in effect on the billing date in month_entry"""
+        # parse_date, not get_date: get_date resets a date still being typed
+        try:
+            return get_registry().for_date(month_entry.parse_date(month_entry.get()))
+        except (ValueError, IndexError):
+            return current_tariff()
+
+    def read_statement():
+        """Price the form as it stands: (lines, kWh, bill values), or None if kWh is invalid"""
         customer_type = type_box.get().lower()
         discount_value = discount_combo.get()
-        billing_month = month_entry.get()
 
         # Check if senior discount applies
         is_senior = discount_value == "Senior Citizen (5%)"
@@ -675,57 +1081,70 @@ def open_main_app(parent=None, on_logout=None):
         try:
             units = float(units_entry.get())
         except Exception:
-            output_box.config(state='normal')
-            output_box.delete("1.0", END)
-            output_box.insert(END, "Error: Invalid kWh input. Please enter a valid number.\n")
-            output_box.config(state='disabled')
+            return None
+
+        # Calculate bill (returns 7 values)
+        bill = calculate_bill(units, customer_type, is_senior, billing_tariff())
+        lines = statement_lines(name_entry.get(), acc_entry.get(), addr_entry.get(),
+                                customer_type, discount_value, month_entry.get(),
+                                units, bill, is_senior)
+        return lines, units, bill
+
+    @metrics.timed("bill_preview")
+    def update_preview():
+        preview_job["id"] = None
+        if not units_entry.get().strip():
+            statement.clear()
             return
+        result = read_statement()
+        if result is None:
+            statement.message("Error: Invalid kWh input. Please enter a valid number.")
+        else:
+            statement.show(result[0])
+
+    def schedule_preview(*_):
+        """Recompute the preview once typing pauses for PREVIEW_DELAY_MS"""
+        cancel_preview()
+        preview_job["id"] = frame.after(PREVIEW_DELAY_MS, update_preview)
+
+    def cancel_preview():
+        if preview_job["id"] is not None:
+            frame.after_cancel(preview_job["id"])
+            preview_job["id"] = None
+
+    # Every field shown in the statement refreshes it; the date's variable
+    # changes whether the date is picked from the calendar or typed
+    for var in (name_var, acc_var, addr_var, month_var, units_var):
+        var.trace_add("write", schedule_preview)
+    type_box.bind("<<ComboboxSelected>>", schedule_preview, add="+")
+    discount_combo.bind("<<ComboboxSelected>>", schedule_preview, add="+")
+    frame.bind("<Destroy>", lambda e: cancel_preview() if e.widget is frame else None, add="+")
+
+    @metrics.timed("generate_bill")
+    def generate_bill():
+        cancel_preview()
+        result = read_statement()
+        if result is None:
+            statement.message("Error: Invalid kWh input. Please enter a valid number.")
+            return
+        lines, units, bill = result
+        total, discount_amount = bill[5], bill[6]
 
-        # Calculate bill (now returns 7 values)
-        energy, fixed, vat, env_fee, applied_rates, total, discount_amount = calculate_bill(
-            units, customer_type, is_senior
-        )
-
-        # Display Output
-        output_box.config(state='normal')
-        output_box.delete("1.0", END)
-        output_box.insert(END, "=" * 50 + "\n")
-        output_box.insert(END, "ELECTRIC BILL STATEMENT\n")
-        output_box.insert(END, "=" * 50 + "\n\n")
-        output_box.insert(END, f"Customer Name: {name}\n")
-        output_box.insert(END, f"Account Number: {account}\n")
-        output_box.insert(END, f"Address: {address}\n")
-        output_box.insert(END, f"Consumer Type: {customer_type}\n")
-        output_box.insert(END, f"Discount Applied: {discount_value}\n")
-        output_box.insert(END, f"Billing Month: {billing_month}\n")
-        output_box.insert(END, "-" * 40 + "\n")
-        output_box.insert(END, f"Total kWh Used: {units} kWh\n")
-        output_box.insert(END, f"kWh Rate: ₱{applied_rates}/kWh\n")
-        output_box.insert(END, f"Fixed Fee: ₱{fixed:.2f}\n")
-        output_box.insert(END, f"Base Charge: ₱{energy:.2f}\n")
-        output_box.insert(END, f"Environmental Fee: ₱{env_fee:.2f}\n")
-        output_box.insert(END, f"VAT (12%): ₱{vat:.2f}\n")
-
-        # Show discount if applied
-        if is_senior:
-            output_box.insert(END, f"Senior Discount (5%): -₱{discount_amount:.2f}\n")
-
-        output_box.insert(END, "-" * 40 + "\n")
-        output_box.insert(END, f"TOTAL AMOUNT DUE: ₱{total:.2f}\n")
-        output_box.insert(END, "=" * 50 + "\n")
-        output_box.config(state='disabled')
+        # Display Output (only lines that differ from the preview are redrawn)
+        statement.show(lines)
 
         # ADD TO HISTORY - AFTER calculating all values
         history_manager.add_calculation(
-            customer_name=name,
-            account=account,
+            customer_name=name_entry.get(),
+            account=acc_entry.get(),
             kwh_used=units,
             total_cost=total,
-            customer_type=customer_type,
-            discount_value=discount_value,
+            customer_type=type_box.get().lower(),
+            discount_value=discount_combo.get(),
             discount_amount=discount_amount,
-            billing_month=billing_month
+            billing_month=month_entry.get()
         )
+        metrics.incr("bills_generated")
 
     def download_pdf():
         file = filedialog.asksaveasfilename(
@@ -738,9 +1157,7 @@ def open_main_app(parent=None, on_logout=None):
         try:
             units = float(units_entry.get())
         except Exception:
-            output_box.config(state='normal')
-            output_box.insert(END, "\nError: Invalid kWh input for PDF.\n")
-            output_box.config(state='disabled')
+            statement.append("\nError: Invalid kWh input for PDF.\n")
             return
 
         customer_type = type_box.get().lower()
@@ -749,7 +1166,7 @@ def open_main_app(parent=None, on_logout=None):
 
         # Calculate with discount if applicable
         energy, fixed, vat, env_fee, applied_rates, total, discount_amount = calculate_bill(
-            units, customer_type, is_senior
+            units, customer_type, is_senior, billing_tariff()
         )
 
         data = {
@@ -769,13 +1186,14 @@ def open_main_app(parent=None, on_logout=None):
             "total": total
         }
 
-        generate_bill_pdf(data, file)
+        from pdf_maker import generate_bill_pdf  # loads ReportLab on first PDF
+        with metrics.span("download_pdf"):  # not counting the save dialog
+            generate_bill_pdf(data, file)
+        metrics.incr("pdfs_written")
 
     def export_csv():
         """Export all history to CSV file (from calculator tab)"""
-        history_data = history_manager.get_session_history()
-
-        if not history_data:
+        if not history_manager.aggregates.count:
             messagebox.showinfo("No Data", "No calculation history to export.")
             return
 
@@ -792,28 +1210,14 @@ def open_main_app(parent=None, on_logout=None):
         if not path:
             return
 
-        try:
-            with open(path, "w", newline="", encoding="utf-8") as f:
-                writer = csv.writer(f)
-                # Write header
-                writer.writerow([
-                    "Timestamp", "Customer Name", "Account Number",
-                    "kWh Used", "Total Cost", "Customer Type",
-                    "Discount Type", "Discount Amount", "Billing Month"
-                ])
-                # Write data
-                for r in history_data:
-                    writer.writerow([
-                        r['timestamp'], r['customer_name'], r['account'],
-                        r['kwh_used'], r['total_cost'], r['customer_type'],
-                        r['discount_value'], r['discount_amount'], r['billing_month']
-                    ])
-
-            messagebox.showinfo("Success", f"CSV exported to:\n{path}")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to export CSV:\n{str(e)}")
+        with metrics.span("export_csv"):  # not counting the save dialog
+            history_manager.start_export(path, write_csv_rows, write_header=write_csv_header,
+                                         newline="", kind="CSV",
+                                         success_message=f"CSV exported to:\n{path}")
 
     if owns_root:
+        from diagnostics import open_diagnostics
+        win.bind("<F12>", lambda e: open_diagnostics(win))
         win.mainloop()
 
     return frame
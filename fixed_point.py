@@ -0,0 +1,277 @@
+"""fixed_point.py
+
+Exact billing in integer centavos. Readings are resolved to whole Wh,
+tier rates to 0.0001 peso per kWh and percentage rates to parts per
+million. Everything after that is integer arithmetic. Each line item is
+rounded to the centavo once, with the mode the rounding policy gives it,
+and the total is the sum of the rounded items. The bill therefore always
+adds up the way the ledger does.
+
+``calculate_bill_cents`` is the scalar path and ``calculate_bills_cents``
+the vectorized one (int64 arrays). Both give identical results.
+
+Run ``python fixed_point.py`` to check scalar/batch parity and benchmark
+both against the float path.
+"""
+import math
+import time
+from bisect import bisect_left
+from collections import namedtuple
+from decimal import Decimal, ROUND_DOWN, ROUND_HALF_EVEN, ROUND_HALF_UP
+from functools import lru_cache
+
+from tariffs import current_tariff, schedule_for
+
+WH_PER_KWH = 1000
+RATE_SCALE = 10000          # tier rates in 0.0001 peso per kWh
+PPM = 1000000               # percentage rates in parts per million
+# Wh x (0.0001 peso / kWh) = 1e-7 peso; 1e5 of those make a centavo
+_SUB_PER_CENTAVO = WH_PER_KWH * RATE_SCALE // 100
+_UNBOUNDED = 2 ** 62
+# Largest reading priced (1e9 kWh). Keeps every int64 intermediate below
+# 2**63 for tier rates up to 90 peso/kWh, and below _UNBOUNDED.
+MAX_WH = 10 ** 12
+
+# Rounding mode for each line item, using the decimal module's names.
+# Supported: ROUND_HALF_UP, ROUND_HALF_EVEN and ROUND_DOWN.
+RoundingPolicy = namedtuple("RoundingPolicy", "energy vat env discount")
+DEFAULT_ROUNDING = RoundingPolicy(ROUND_HALF_UP, ROUND_HALF_UP, ROUND_HALF_UP, ROUND_HALF_UP)
+
+# Field order matches calculate_bill, but every amount is in centavos
+BillCents = namedtuple("BillCents", "energy fixed vat env rate total discount")
+
+# Fixed-point copy of a tariffs.Schedule
+_FixedSchedule = namedtuple("_FixedSchedule", "fixed uppers starts start_costs rates")
+
+
+def _scaled(value, scale):
+    """Exact integer value * scale for a rate read from tariffs.json."""
+    return int((Decimal(str(value)) * scale).to_integral_value(ROUND_HALF_EVEN))
+
+
+@lru_cache(maxsize=None)
+def _fixed_schedule(schedule):
+    """Integer copy of a compiled schedule, built once per schedule."""
+    uppers, starts, start_costs, rates = [], [], [], []
+    cost = 0
+    for upper, start, rate in zip(schedule.uppers, schedule.starts, schedule.rates):
+        start_wh = _scaled(start, WH_PER_KWH)
+        rate_e4 = _scaled(rate, RATE_SCALE)
+        upper_wh = _UNBOUNDED if upper == float("inf") else _scaled(upper, WH_PER_KWH)
+        starts.append(start_wh)
+        start_costs.append(cost)
+        rates.append(rate_e4)
+        uppers.append(upper_wh)
+        cost += (upper_wh - start_wh) * rate_e4
+    return _FixedSchedule(_scaled(schedule.fixed, 100), tuple(uppers), tuple(starts),
+                          tuple(start_costs), tuple(rates))
+
+
+@lru_cache(maxsize=None)
+def _ppm(rate):
+    return _scaled(rate, PPM)
+
+
+def to_wh(units):
+    """Resolve a kWh reading to whole Wh (negative readings bill as zero).
+
+    Raises ValueError for readings that are not finite or above MAX_WH.
+    """
+    units = float(units)
+    if not math.isfinite(units) or units * WH_PER_KWH > MAX_WH:
+        raise ValueError(f"kWh reading {units!r} must be finite and at most {MAX_WH // WH_PER_KWH}")
+    return max(0, round(units * WH_PER_KWH))
+
+
+def div_round(n, d, mode=ROUND_HALF_UP):
+    """n / d rounded to an integer with a decimal rounding mode (n >= 0, d > 0)."""
+    q, r = divmod(n, d)
+    if mode == ROUND_HALF_UP:
+        return q + (2 * r >= d)
+    if mode == ROUND_HALF_EVEN:
+        return q + (2 * r > d or (2 * r == d and q % 2 == 1))
+    if mode == ROUND_DOWN:
+        return q
+    raise ValueError(f"Unsupported rounding mode: {mode}")
+
+
+def format_cents(cents):
+    """'1234.50' for 123450 centavos."""
+    sign = "-" if cents < 0 else ""
+    q, r = divmod(abs(int(cents)), 100)
+    return f"{sign}{q}.{r:02d}"
+
+
+def calculate_bill_cents(units, customer_type, is_senior=False, tariff=None,
+                         rounding=DEFAULT_ROUNDING):
+    """Fixed-point counterpart of calculate_bill; returns BillCents."""
+    if tariff is None:
+        tariff = current_tariff()
+    schedule = _fixed_schedule(schedule_for(tariff, customer_type))
+
+    wh = to_wh(units)
+    if wh:
+        k = bisect_left(schedule.uppers, wh)
+        sub = schedule.start_costs[k] + (wh - schedule.starts[k]) * schedule.rates[k]
+        rate_e4 = schedule.rates[k]
+    else:
+        sub = rate_e4 = 0
+    energy = div_round(sub, _SUB_PER_CENTAVO, rounding.energy)
+    vat = div_round(energy * _ppm(tariff.vat_rate), PPM, rounding.vat)
+    env_fee = div_round(energy * _ppm(tariff.env_fee_rate), PPM, rounding.env)
+    total = energy + schedule.fixed + vat + env_fee
+
+    discount = 0
+    if is_senior:
+        discount = div_round(total * _ppm(tariff.senior_discount_rate), PPM, rounding.discount)
+        total -= discount
+
+    rate = div_round(rate_e4, RATE_SCALE // 100, ROUND_HALF_UP)
+    return BillCents(energy, schedule.fixed, vat, env_fee, rate, total, discount)
+
+
+# ========== VECTORIZED PATH ==========
+def _div_round_array(n, d, mode):
+    import numpy as np
+    q, r = np.divmod(n, d)
+    if mode == ROUND_HALF_UP:
+        return q + (2 * r >= d)
+    if mode == ROUND_HALF_EVEN:
+        return q + ((2 * r > d) | ((2 * r == d) & (q % 2 == 1)))
+    if mode == ROUND_DOWN:
+        return q
+    raise ValueError(f"Unsupported rounding mode: {mode}")
+
+
+@lru_cache(maxsize=None)
+def _schedule_arrays(schedule):
+    import numpy as np
+    fixed = _fixed_schedule(schedule)
+    return tuple(np.array(a, dtype=np.int64)
+                 for a in (fixed.uppers, fixed.starts, fixed.start_costs, fixed.rates))
+
+
+def _price_batch(wh, schedule):
+    """Return (energy in 1e-7 peso, rate in 0.0001 peso/kWh, fixed in centavos)."""
+    import numpy as np
+    uppers, starts, start_costs, rates = _schedule_arrays(schedule)
+    k = np.minimum(np.searchsorted(uppers, wh, side="left"), len(uppers) - 1)
+    used = wh > 0
+    sub = np.where(used, start_costs[k] + (wh - starts[k]) * rates[k], 0)
+    return sub, np.where(used, rates[k], 0), _fixed_schedule(schedule).fixed
+
+
+def calculate_bills_cents(units, customer_types, is_senior=None, tariff=None,
+                          rounding=DEFAULT_ROUNDING):
+    """Vectorized calculate_bill_cents.
+
+    Takes the same arguments as batch_billing.calculate_bills and returns
+    the same dict keys, as int64 arrays of centavos. Raises ValueError if
+    any reading is not finite or above MAX_WH (see to_wh).
+    """
+    import numpy as np
+
+    units = np.atleast_1d(np.asarray(units, dtype=float))
+    bad = ~np.isfinite(units) | (units * WH_PER_KWH > MAX_WH)
+    if bad.any():
+        to_wh(units[bad][0])  # raises with the first bad reading
+    wh = np.maximum(np.rint(units * WH_PER_KWH), 0).astype(np.int64)
+    types = np.broadcast_to(np.asarray(customer_types), wh.shape)
+    if is_senior is None:
+        senior = np.zeros(wh.shape, dtype=bool)
+    else:
+        senior = np.asarray(is_senior, dtype=bool)
+    if tariff is None:
+        tariff = current_tariff()
+
+    sub = np.zeros_like(wh)
+    rate_e4 = np.zeros_like(wh)
+    fixed = np.zeros_like(wh)
+    rest = np.ones(wh.shape, dtype=bool)
+    for name, schedule in tariff.schedules.items():
+        if name == tariff.default_type:
+            continue
+        mask = types == name
+        if mask.any():
+            sub[mask], rate_e4[mask], fixed[mask] = _price_batch(wh[mask], schedule)
+            rest &= ~mask
+    if rest.any():
+        sub[rest], rate_e4[rest], fixed[rest] = _price_batch(
+            wh[rest], tariff.schedules[tariff.default_type])
+
+    energy = _div_round_array(sub, _SUB_PER_CENTAVO, rounding.energy)
+    vat = _div_round_array(energy * _ppm(tariff.vat_rate), PPM, rounding.vat)
+    env_fee = _div_round_array(energy * _ppm(tariff.env_fee_rate), PPM, rounding.env)
+    total = energy + fixed + vat + env_fee
+    discount = np.where(
+        senior,
+        _div_round_array(total * _ppm(tariff.senior_discount_rate), PPM, rounding.discount),
+        0)
+
+    return {
+        "energy": energy,
+        "fixed": fixed,
+        "vat": vat,
+        "env": env_fee,
+        "rate": _div_round_array(rate_e4, RATE_SCALE // 100, ROUND_HALF_UP),
+        "total": total - discount,
+        "discount": discount,
+    }
+
+
+# ========== PARITY AND BENCHMARK ==========
+def _sample(samples, seed):
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    units = np.round(rng.uniform(-10, 2000, samples), 3)
+    types = rng.choice(["residential", "commercial"], samples)
+    senior = rng.random(samples) < 0.3
+    return units, types, senior
+
+
+def check_parity(samples=100000, seed=0):
+    """Rows where the vectorized and scalar fixed-point paths disagree."""
+    units, types, senior = _sample(samples, seed)
+    batch = calculate_bills_cents(units, types, senior)
+    mismatches = 0
+    for i in range(samples):
+        expected = calculate_bill_cents(float(units[i]), str(types[i]), bool(senior[i]))
+        if tuple(int(batch[k][i]) for k in BillCents._fields) != tuple(expected):
+            mismatches += 1
+    return mismatches
+
+
+def benchmark(samples=200000, seed=0):
+    """Rows/s for the float and fixed-point paths, scalar and vectorized.
+
+    Also counts the bills whose float total differs from the exact total.
+    """
+    from batch_billing import calculate_bills
+    from billing_core import calculate_bill
+
+    units, types, senior = _sample(samples, seed)
+    rows = list(zip(units.tolist(), types.tolist(), senior.tolist()))
+    results = {}
+
+    def timed(name, fn):
+        start = time.perf_counter()
+        out = fn()
+        results[name] = samples / (time.perf_counter() - start)
+        return out
+
+    floats = timed("float scalar", lambda: [calculate_bill(*r) for r in rows])
+    exact = timed("fixed scalar", lambda: [calculate_bill_cents(*r) for r in rows])
+    timed("float batch", lambda: calculate_bills(units, types, senior))
+    timed("fixed batch", lambda: calculate_bills_cents(units, types, senior))
+    differ = sum(round(f[5] * 100) != e.total for f, e in zip(floats, exact))
+    return results, differ
+
+
+if __name__ == "__main__":
+    bad = check_parity()
+    print(f"Scalar/batch parity mismatches: {bad}")
+    rates, differ = benchmark()
+    for name, rate in rates.items():
+        print(f"  {name:<13} {rate:>14,.0f} rows/s")
+    print(f"Float totals differing from exact: {differ}")
+    raise SystemExit(1 if bad else 0)
@@ -0,0 +1,20 @@
+"""image_cache.py
+
+Shared PhotoImage cache for the UI assets. Each image file is decoded the
+first time a screen asks for it and then reused by every other screen in
+the same Tk root, instead of every builder creating its own copies.
+"""
+from tkinter import PhotoImage
+
+
+def load_image(master, path):
+    """Return the PhotoImage for path, decoding it at most once per Tk root.
+
+    The cache lives on the root window, so images are released with it.
+    """
+    root = master._root()
+    cache = root.__dict__.setdefault("_image_cache", {})
+    image = cache.get(path)
+    if image is None:
+        image = cache[path] = PhotoImage(master=root, file=path)
+    return image
@@ -2,24 +2,34 @@
 
 Modular login UI builder used by the main application.
 """
-from tkinter import Frame, Label, Button, Entry, PhotoImage, StringVar, messagebox, Toplevel
-import sqlite3
+from tkinter import Frame, Label, Button, Entry, StringVar, messagebox, Toplevel
+from concurrent.futures import ThreadPoolExecutor
 from Database import db_utils
+from Database.connection_pool import ConnectionPool
+from image_cache import load_image
+import metrics
 
 
-def build_login_frame(parent, db_path, on_login_success=None, on_show_register=None):
+LOGIN_POLL_MS = 50  # how often the UI checks on a running login
+
+
+def build_login_frame(parent, db_path, on_login_success=None, on_show_register=None, pool=None):
     """Create and return a Frame for login UI.
 
     on_login_success: optional callable invoked when login succeeds
     on_show_register: optional callable to show register screen
+    pool: optional shared ConnectionPool; one is created for db_path if omitted
     """
+    if pool is None:
+        pool = ConnectionPool(db_path)
+
     frame = Frame(parent, bg="#525561")
 
-    frame._backgroundImage = PhotoImage(file="assets/image_1.png")
+    frame._backgroundImage = load_image(frame, "assets/image_1.png")
     bg_imageLogin = Label(frame, image=frame._backgroundImage, bg="#525561")
     bg_imageLogin.place(x=120, y=28)
 
-    frame._header_left = PhotoImage(file="assets/headerText_image.png")
+    frame._header_left = load_image(frame, "assets/headerText_image.png")
     Label(bg_imageLogin, image=frame._header_left, bg="#272A37").place(x=60, y=45)
     Label(bg_imageLogin, text="Electric Bill Calculator", fg="#FFFFFF",
           font=("yu gothic ui bold", 20 * -1), bg="#272A37").place(x=110, y=45)
@@ -30,7 +40,7 @@ def build_login_frame(parent, db_path, on_login_success=None, on_show_register=N
     email_var = StringVar()
     pwd_var = StringVar()
 
-    frame._email_img = PhotoImage(file="assets/email.png")
+    frame._email_img = load_image(frame, "assets/email.png")
     email_container = Label(bg_imageLogin, image=frame._email_img, bg="#272A37")
     email_container.place(x=76, y=242)
     Label(email_container, text="Email account", fg="#FFFFFF",
@@ -38,7 +48,7 @@ def build_login_frame(parent, db_path, on_login_success=None, on_show_register=N
     Entry(email_container, bd=0, bg="#3D404B", highlightthickness=0, font=("yu gothic ui SemiBold", 16 * -1),
           textvariable=email_var).place(x=8, y=17, width=354, height=27)
 
-    frame._pwd_img = PhotoImage(file="assets/email.png")
+    frame._pwd_img = load_image(frame, "assets/email.png")
     pwd_container = Label(bg_imageLogin, image=frame._pwd_img, bg="#272A37")
     pwd_container.place(x=80, y=330)
     Label(pwd_container, text="Password", fg="#FFFFFF", font=("yu gothic ui SemiBold", 13 * -1),
@@ -46,15 +56,51 @@ def build_login_frame(parent, db_path, on_login_success=None, on_show_register=N
     Entry(pwd_container, bd=0, bg="#3D404B", highlightthickness=0, font=("yu gothic ui SemiBold", 16 * -1),
           textvariable=pwd_var, show='•').place(x=8, y=17, width=354, height=27)
 
-    frame._submit_img = PhotoImage(file="assets/button_1.png")
+    frame._submit_img = load_image(frame, "assets/button_1.png")
+
+    # Password checks run on a worker so the window keeps repainting;
+    # the result is picked up on the Tk thread by polling with after().
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="login")
+    frame.bind("<Destroy>", lambda e: executor.shutdown(wait=False) if e.widget is frame else None)
+    pending = {"future": None}
+
+    status_label = Label(bg_imageLogin, text="", fg="#FFFFFF",
+                         font=("yu gothic ui SemiBold", 13 * -1), bg="#272A37")
+    status_label.place(x=120, y=515)
+
+    def check_credentials(email, password):
+        with metrics.span("login"), pool.connection() as conn:
+            ok = db_utils.verify_user(conn, email, password)
+        metrics.incr("login_succeeded" if ok else "login_failed")
+        return ok
+
+    def set_busy(busy):
+        Login_button_1.config(state="disabled" if busy else "normal",
+                              cursor="watch" if busy else "hand2")
+        status_label.config(text="Checking credentials..." if busy else "")
 
     def login():
+        if pending["future"] is not None:
+            return  # a check is already running
         if not (email_var.get().strip() and pwd_var.get()):
             messagebox.showinfo("Failed", "Please enter email and password")
             return
-        conn = sqlite3.connect(db_path)
-        ok = db_utils.verify_user(conn, email_var.get().strip(), pwd_var.get())
-        conn.close()
+        pending["future"] = executor.submit(check_credentials, email_var.get().strip(), pwd_var.get())
+        set_busy(True)
+        frame.after(LOGIN_POLL_MS, finish_login)
+
+    def finish_login():
+        future = pending["future"]
+        if not future.done():
+            frame.after(LOGIN_POLL_MS, finish_login)
+            return
+        pending["future"] = None
+        set_busy(False)
+        try:
+            ok = future.result()
+        except Exception as e:
+            messagebox.showerror("Error", f"Login failed:\n{str(e)}")
+            return
         if ok:
             messagebox.showinfo("Success", "Logged in Successfully :)")
             if callable(on_login_success):
@@ -93,14 +139,13 @@ def build_login_frame(parent, db_path, on_login_success=None, on_show_register=N
             if not email_entry3.get().strip() or not new_password_entry.get():
                 messagebox.showerror("Error", "All Fields are required")
                 return
-            conn = sqlite3.connect(db_path)
-            exists = db_utils.user_exists(conn, email_entry3.get().strip())
+            with pool.connection() as conn:
+                exists = db_utils.user_exists(conn, email_entry3.get().strip())
+                if exists:
+                    db_utils.update_password(conn, email_entry3.get().strip(), new_password_entry.get())
             if not exists:
                 messagebox.showerror("Error", "Email does not exist")
-                conn.close()
                 return
-            db_utils.update_password(conn, email_entry3.get().strip(), new_password_entry.get())
-            conn.close()
             messagebox.showinfo('Confirmed', "Password changed successfully :)")
             win.destroy()
 
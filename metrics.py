@@ -0,0 +1,233 @@
+"""metrics.py
+
+Lightweight timing spans, counters and latency histograms.
+
+    @metrics.timed("generate_bill")
+    def generate_bill(): ...
+
+    with metrics.span("frame_build.login"):
+        ...
+
+Recording is off by default. While it is off, a timed function costs
+one global check and span() returns a shared no-op context manager.
+Set BILLING_METRICS=1 (or call enable()) to record. Set
+BILLING_METRICS_FILE to a path to have a snapshot written there every
+BILLING_METRICS_INTERVAL seconds: JSON if the name ends in .json,
+Prometheus text otherwise.
+
+No GUI dependencies; the diagnostics panel lives in diagnostics.py.
+"""
+import functools
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+# Histogram upper bounds in seconds; the last bucket is +Inf
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+WRITE_INTERVAL = 15.0
+
+_enabled = os.environ.get("BILLING_METRICS", "") not in ("", "0")
+_lock = threading.Lock()
+_spans = {}
+_counters = {}
+_writer = None
+
+
+class SpanStats:
+    """Call count, error count, total/max latency and a bucket histogram."""
+    __slots__ = ("count", "errors", "total", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th quantile."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(BUCKETS + (self.max,), self.buckets):
+            seen += n
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def as_dict(self):
+        return {"count": self.count, "errors": self.errors, "total": self.total,
+                "max": self.max, "mean": self.total / self.count if self.count else 0.0,
+                "p50": self.quantile(0.5), "p99": self.quantile(0.99),
+                "buckets": dict(zip([str(b) for b in BUCKETS] + ["+Inf"], self.buckets))}
+
+
+def enabled():
+    return _enabled
+
+
+def enable(on=True):
+    global _enabled
+    _enabled = on
+
+
+def reset():
+    with _lock:
+        _spans.clear()
+        _counters.clear()
+
+
+def record(name, seconds, error=False):
+    """Add one timed call to the span called name."""
+    with _lock:
+        stats = _spans.get(name)
+        if stats is None:
+            stats = _spans[name] = SpanStats()
+        stats.count += 1
+        stats.errors += error
+        stats.total += seconds
+        if seconds > stats.max:
+            stats.max = seconds
+        stats.buckets[bisect_left(BUCKETS, seconds)] += 1
+
+
+def incr(name, amount=1):
+    """Increase the counter called name (no-op while disabled)."""
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        record(self.name, time.perf_counter() - self.start, exc_type is not None)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name):
+    """Context manager timing its block into the span called name."""
+    return _Span(name) if _enabled else _NULL_SPAN
+
+
+def timed(name):
+    """Decorator timing every call of a function into the span called name."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            error = True
+            try:
+                result = fn(*args, **kwargs)
+                error = False
+                return result
+            finally:
+                record(name, time.perf_counter() - start, error)
+        return wrapper
+    return decorate
+
+
+# ========== EXPORT ==========
+def snapshot():
+    """Plain-dict copy of every span and counter."""
+    with _lock:
+        return {"time": time.time(),
+                "spans": {name: s.as_dict() for name, s in sorted(_spans.items())},
+                "counters": dict(sorted(_counters.items()))}
+
+
+def _label(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def prometheus_text(data=None):
+    """Snapshot in the Prometheus text exposition format."""
+    data = data or snapshot()
+    lines = ["# TYPE billing_span_seconds histogram"]
+    for name, s in data["spans"].items():
+        label = _label(name)
+        cumulative = 0
+        for bound, n in s["buckets"].items():
+            cumulative += n
+            lines.append(f'billing_span_seconds_bucket{{span="{label}",le="{bound}"}} {cumulative}')
+        lines.append(f'billing_span_seconds_sum{{span="{label}"}} {s["total"]:.6f}')
+        lines.append(f'billing_span_seconds_count{{span="{label}"}} {s["count"]}')
+    lines.append("# TYPE billing_span_errors_total counter")
+    for name, s in data["spans"].items():
+        lines.append(f'billing_span_errors_total{{span="{_label(name)}"}} {s["errors"]}')
+    lines.append("# TYPE billing_events_total counter")
+    for name, value in data["counters"].items():
+        lines.append(f'billing_events_total{{name="{_label(name)}"}} {value}')
+    return "\n".join(lines) + "\n"
+
+
+def write_file(path):
+    """Write a snapshot to path atomically (JSON for .json, else Prometheus text)."""
+    data = snapshot()
+    text = json.dumps(data, indent=2) if path.lower().endswith(".json") else prometheus_text(data)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def start_file_writer(path, interval=WRITE_INTERVAL):
+    """Write a snapshot to path every interval seconds on a daemon thread."""
+    global _writer
+    if _writer is not None:
+        _writer.set()
+    stop = threading.Event()
+
+    def loop():
+        while True:
+            stopped = stop.wait(interval)
+            try:
+                write_file(path)
+            except OSError:
+                pass
+            if stopped:
+                return
+
+    threading.Thread(target=loop, name="metrics-writer", daemon=True).start()
+    _writer = stop
+    return stop
+
+
+def stop_file_writer():
+    """Stop the periodic writer after one final write."""
+    global _writer
+    if _writer is not None:
+        _writer.set()
+        _writer = None
+
+
+if _enabled and os.environ.get("BILLING_METRICS_FILE"):
+    start_file_writer(os.environ["BILLING_METRICS_FILE"],
+                      float(os.environ.get("BILLING_METRICS_INTERVAL", WRITE_INTERVAL)))
@@ -1,12 +1,42 @@
 # pdf_generator.py
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+import io
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
 from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter
 
-def generate_bill_pdf(data, file_name="ElectricBill.pdf"):
-    pdf = SimpleDocTemplate(file_name, pagesize=letter)
-    styles = getSampleStyleSheet()
+# Built once and shared by every bill rendered in this process
+_STYLES = None
+
+CUSTOMER_TABLE_STYLE = TableStyle([
+    ('BOX', (0,0), (-1,-1), 1, colors.black),
+    ('BACKGROUND', (0,0), (-1,0), colors.lightgrey),
+    ('INNERGRID', (0,0), (-1,-1), 0.5, colors.black),
+])
+
+BILL_TABLE_STYLE = TableStyle([
+    ('BOX', (0,0), (-1,-1), 1, colors.black),
+    ('BACKGROUND', (0,6), (-1,6), colors.lightgrey),
+    ('FONT', (0,6), (-1,6), 'Helvetica-Bold', 12),
+    ('INNERGRID', (0,0), (-1,-1), 0.5, colors.black),
+])
+
+
+def _get_styles():
+    global _STYLES
+    if _STYLES is None:
+        _STYLES = getSampleStyleSheet()
+    return _STYLES
+
+
+def bill_elements(data):
+    """Return the flowables for one bill receipt."""
+    styles = _get_styles()
     elements = []
 
     # Title
@@ -24,11 +54,7 @@ def generate_bill_pdf(data, file_name="ElectricBill.pdf"):
     ]
 
     table = Table(customer_table, colWidths=[150, 300])
-    table.setStyle(TableStyle([
-        ('BOX', (0,0), (-1,-1), 1, colors.black),
-        ('BACKGROUND', (0,0), (-1,0), colors.lightgrey),
-        ('INNERGRID', (0,0), (-1,-1), 0.5, colors.black),
-    ]))
+    table.setStyle(CUSTOMER_TABLE_STYLE)
 
     elements.append(table)
     elements.append(Spacer(1, 20))
@@ -45,13 +71,160 @@ def generate_bill_pdf(data, file_name="ElectricBill.pdf"):
     ]
 
     billbox = Table(bill_table, colWidths=[200, 250])
-    billbox.setStyle(TableStyle([
-        ('BOX', (0,0), (-1,-1), 1, colors.black),
-        ('BACKGROUND', (0,6), (-1,6), colors.lightgrey),
-        ('FONT', (0,6), (-1,6), 'Helvetica-Bold', 12),
-        ('INNERGRID', (0,0), (-1,-1), 0.5, colors.black),
-    ]))
+    billbox.setStyle(BILL_TABLE_STYLE)
 
     elements.append(billbox)
+    return elements
 
+
+def generate_bill_pdf(data, file_name="ElectricBill.pdf"):
+    pdf = SimpleDocTemplate(file_name, pagesize=letter)
+    pdf.build(bill_elements(data))
+
+
+def render_bill_pdf(data):
+    """Render one bill and return the PDF as bytes instead of writing a file."""
+    buffer = io.BytesIO()
+    generate_bill_pdf(data, buffer)
+    return buffer.getvalue()
+
+
+def generate_bills_pdf(bills, file_name="ElectricBills.pdf"):
+    """Render many bills into one multi-page PDF, one receipt per page.
+
+    All pages are laid out in a single build pass. Returns the page count.
+    """
+    elements = []
+    count = 0
+    for data in bills:
+        if count:
+            elements.append(PageBreak())
+        elements.extend(bill_elements(data))
+        count += 1
+    pdf = SimpleDocTemplate(file_name, pagesize=letter)
     pdf.build(elements)
+    return count
+
+
+# ========== BULK RENDERING ==========
+def _safe_name(value):
+    return re.sub(r"[^\w.-]+", "_", str(value or "").strip()).strip("._")
+
+
+def bill_pdf_path(output_dir, data, index=0):
+    """Output path for a bill: account number and billing month."""
+    name = _safe_name(data.get("account")) or f"bill_{index}"
+    month = _safe_name(data.get("month"))
+    return os.path.join(output_dir, f"{name}_{month}.pdf" if month else f"{name}.pdf")
+
+
+def _unique_path(path, used):
+    """path, or path with -2, -3, ... appended if this run already used it."""
+    root, ext = os.path.splitext(path)
+    candidate, n = path, 1
+    while os.path.normcase(candidate).lower() in used:
+        n += 1
+        candidate = f"{root}-{n}{ext}"
+    used.add(os.path.normcase(candidate).lower())
+    return candidate
+
+
+def _render_one(data, file_name, overwrite=False):
+    """Process-pool task: render one bill, returning an error string on failure.
+
+    Without overwrite the file is created exclusively, so an existing file
+    is reported as a failure instead of being replaced.
+    """
+    try:
+        pdf = render_bill_pdf(data)
+        with open(file_name, "wb" if overwrite else "xb") as f:
+            f.write(pdf)
+        return file_name, None
+    except FileExistsError:
+        return file_name, "file already exists (not overwritten)"
+    except Exception as e:
+        return file_name, f"{type(e).__name__}: {e}"
+
+
+def generate_bill_pdfs(bills, output_dir, workers=None, progress=None, overwrite=False):
+    """Render many bills across a process pool, one PDF per bill.
+
+    bills: iterable of bill dicts (same keys as generate_bill_pdf)
+    workers: number of processes (defaults to the CPU count)
+    progress: optional callable(done, failed) called after each file
+    overwrite: replace PDFs already in output_dir instead of failing them
+
+    Files are named after the account and billing month; a bill whose
+    name repeats within the run gets a -2, -3, ... suffix, so no two
+    workers ever write the same path.
+
+    Returns (number of files written, list of (path, error) failures).
+    Bills are submitted lazily, so large iterables are never fully loaded.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    max_pending = workers * 4
+    written = 0
+    failures = []
+    used = set()
+
+    def collect(futures):
+        nonlocal written
+        for fut in futures:
+            path, error = fut.result()
+            if error is None:
+                written += 1
+            else:
+                failures.append((path, error))
+            if callable(progress):
+                progress(written + len(failures), len(failures))
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for index, data in enumerate(bills):
+            path = _unique_path(bill_pdf_path(output_dir, data, index), used)
+            pending.add(pool.submit(_render_one, data, path, overwrite))
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+        collect(pending)
+
+    return written, failures
+
+
+if __name__ == "__main__":
+    import argparse
+    import csv
+    import time
+
+    parser = argparse.ArgumentParser(description="Render a bills CSV (from bulk_billing.py) to PDFs.")
+    parser.add_argument("bills", help="CSV of bills")
+    parser.add_argument("output", help="directory to write one PDF per bill into, "
+                                       "or the PDF file to write with --single")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes")
+    parser.add_argument("--single", action="store_true",
+                        help="write every bill into one multi-page PDF instead")
+    parser.add_argument("--overwrite", action="store_true",
+                        help="replace PDFs already in the output directory")
+    args = parser.parse_args()
+
+    if args.single:
+        start = time.perf_counter()
+        with open(args.bills, newline="", encoding="utf-8") as f:
+            pages = generate_bills_pdf(csv.DictReader(f), args.output)
+        print(f"Wrote {pages} pages to {args.output} in {time.perf_counter() - start:.2f}s")
+        sys.exit(0)
+
+    def report(done, failed):
+        if done % 500 == 0:
+            print(f"{done} rendered ({failed} failed)", flush=True)
+
+    start = time.perf_counter()
+    with open(args.bills, newline="", encoding="utf-8") as f:
+        written, failures = generate_bill_pdfs(csv.DictReader(f), args.output,
+                                               workers=args.workers, progress=report,
+                                               overwrite=args.overwrite)
+    for path, error in failures:
+        print(f"Failed {path}: {error}", file=sys.stderr)
+    print(f"Wrote {written} PDFs in {time.perf_counter() - start:.2f}s, {len(failures)} failed")
+    sys.exit(1 if failures else 0)
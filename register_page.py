@@ -1,305 +1,363 @@
-from tkinter import *
+"""register_page.py
 
-window = Tk()
-
-height = 650
-width = 1240
-x = (window.winfo_screenwidth() // 2) - (width // 2)
-y = (window.winfo_screenheight() // 4) - (height // 4)
-window.geometry('{}x{}+{}+{}'.format(width, height, x, y))
-
-window.configure(bg="#525561")
-
-# ================Background Image ====================
-backgroundImage = PhotoImage(file="assets/image_1.png")
-bg_image = Label(
-    window,
-    image=backgroundImage,
-    bg="#525561"
-)
-bg_image.place(x=120, y=28)
-
-# ================ Header Text Left ====================
-headerText_image_left = PhotoImage(file="assets/headerText_image.png")
-headerText_image_label1 = Label(
-    bg_image,
-    image=headerText_image_left,
-    bg="#272A37"
-)
-headerText_image_label1.place(x=60, y=45)
-
-headerText1 = Label(
-    bg_image,
-    text="Electric Bill Calculator",
-    fg="#FFFFFF",
-    font=("yu gothic ui bold", 20 * -1),
-    bg="#272A37"
-)
-headerText1.place(x=110, y=45)
-
-# ================ Header Text Right ====================
-headerText_image_right = PhotoImage(file="assets/headerText_image.png")
-headerText_image_label2 = Label(
-    bg_image,
-    image=headerText_image_right,
-    bg="#272A37"
-)
-headerText_image_label2.place(x=400, y=45)
-
-headerText2 = Label(
-    bg_image,
-    anchor="nw",
-    text="CS1C Final PIT",
-    fg="#FFFFFF",
-    font=("yu gothic ui Bold", 20 * -1),
-    bg="#272A37"
-)
-headerText2.place(x=450, y=45)
-
-# ================ CREATE ACCOUNT HEADER ====================
-createAccount_header = Label(
-    bg_image,
-    text="Create new account",
-    fg="#FFFFFF",
-    font=("yu gothic ui Bold", 28 * -1),
-    bg="#272A37"
-)
-createAccount_header.place(x=75, y=121)
-
-# ================ ALREADY HAVE AN ACCOUNT TEXT ====================
-text = Label(
-    bg_image,
-    text="Already a member?",
-    fg="#FFFFFF",
-    font=("yu gothic ui Regular", 15 * -1),
-    bg="#272A37"
-)
-text.place(x=75, y=187)
-
-# ================ GO TO LOGIN ====================
-switchLogin = Button(
-    bg_image,
-    text="Login",
-    fg="#206DB4",
-    font=("yu gothic ui Bold", 15 * -1),
-    bg="#272A37",
-    bd=0,
-    cursor="hand2",
-    activebackground="#272A37",
-    activeforeground="#ffffff"
-)
-switchLogin.place(x=230, y=185, width=50, height=35)
-
-# ================ First Name Section ====================
-firstName_image = PhotoImage(file="assets/input_img.png")
-firstName_image_Label = Label(
-    bg_image,
-    image=firstName_image,
-    bg="#272A37"
-)
-firstName_image_Label.place(x=80, y=242)
-
-firstName_text = Label(
-    firstName_image_Label,
-    text="First name",
-    fg="#FFFFFF",
-    font=("yu gothic ui SemiBold", 13 * -1),
-    bg="#3D404B"
-)
-firstName_text.place(x=25, y=0)
-
-firstName_icon = PhotoImage(file="assets/name_icon.png")
-firstName_icon_Label = Label(
-    firstName_image_Label,
-    image=firstName_icon,
-    bg="#3D404B"
-)
-firstName_icon_Label.place(x=159, y=15)
-
-firstName_entry = Entry(
-    firstName_image_Label,
-    bd=0,
-    bg="#3D404B",
-    highlightthickness=0,
-    font=("yu gothic ui SemiBold", 16 * -1),
-)
-firstName_entry.place(x=8, y=17, width=140, height=27)
-
-
-# ================ Last Name Section ====================
-lastName_image = PhotoImage(file="assets/input_img.png")
-lastName_image_Label = Label(
-    bg_image,
-    image=lastName_image,
-    bg="#272A37"
-)
-lastName_image_Label.place(x=293, y=242)
-
-lastName_text = Label(
-    lastName_image_Label,
-    text="Last name",
-    fg="#FFFFFF",
-    font=("yu gothic ui SemiBold", 13 * -1),
-    bg="#3D404B"
-)
-lastName_text.place(x=25, y=0)
-
-lastName_icon = PhotoImage(file="assets/name_icon.png")
-lastName_icon_Label = Label(
-    lastName_image_Label,
-    image=lastName_icon,
-    bg="#3D404B"
-)
-lastName_icon_Label.place(x=159, y=15)
-
-lastName_entry = Entry(
-    lastName_image_Label,
-    bd=0,
-    bg="#3D404B",
-    highlightthickness=0,
-    font=("yu gothic ui SemiBold", 16 * -1),
-)
-lastName_entry.place(x=8, y=17, width=140, height=27)
-
-# ================ Email Name Section ====================
-emailName_image = PhotoImage(file="assets/email.png")
-emailName_image_Label = Label(
-    bg_image,
-    image=emailName_image,
-    bg="#272A37"
-)
-emailName_image_Label.place(x=80, y=311)
-
-emailName_text = Label(
-    emailName_image_Label,
-    text="Email account",
-    fg="#FFFFFF",
-    font=("yu gothic ui SemiBold", 13 * -1),
-    bg="#3D404B"
-)
-emailName_text.place(x=25, y=0)
-
-emailName_icon = PhotoImage(file="assets/email-icon.png")
-emailName_icon_Label = Label(
-    emailName_image_Label,
-    image=emailName_icon,
-    bg="#3D404B"
-)
-emailName_icon_Label.place(x=370, y=15)
-
-emailName_entry = Entry(
-    emailName_image_Label,
-    bd=0,
-    bg="#3D404B",
-    highlightthickness=0,
-    font=("yu gothic ui SemiBold", 16 * -1),
-)
-emailName_entry.place(x=8, y=17, width=354, height=27)
-
-
-# ================ Password Name Section ====================
-passwordName_image = PhotoImage(file="assets/input_img.png")
-passwordName_image_Label = Label(
-    bg_image,
-    image=passwordName_image,
-    bg="#272A37"
-)
-passwordName_image_Label.place(x=80, y=380)
-
-passwordName_text = Label(
-    passwordName_image_Label,
-    text="Password",
-    fg="#FFFFFF",
-    font=("yu gothic ui SemiBold", 13 * -1),
-    bg="#3D404B"
-)
-passwordName_text.place(x=25, y=0)
-
-passwordName_icon = PhotoImage(file="assets/pass-icon.png")
-passwordName_icon_Label = Label(
-    passwordName_image_Label,
-    image=passwordName_icon,
-    bg="#3D404B"
-)
-passwordName_icon_Label.place(x=159, y=15)
-
-passwordName_entry = Entry(
-    passwordName_image_Label,
-    bd=0,
-    bg="#3D404B",
-    highlightthickness=0,
-    font=("yu gothic ui SemiBold", 16 * -1),
-)
-passwordName_entry.place(x=8, y=17, width=140, height=27)
-
-
-# ================ Confirm Password Name Section ====================
-confirm_passwordName_image = PhotoImage(file="assets/input_img.png")
-confirm_passwordName_image_Label = Label(
-    bg_image,
-    image=confirm_passwordName_image,
-    bg="#272A37"
-)
-confirm_passwordName_image_Label.place(x=293, y=380)
-
-confirm_passwordName_text = Label(
-    confirm_passwordName_image_Label,
-    text="Confirm Password",
-    fg="#FFFFFF",
-    font=("yu gothic ui SemiBold", 13 * -1),
-    bg="#3D404B"
-)
-confirm_passwordName_text.place(x=25, y=0)
-
-confirm_passwordName_icon = PhotoImage(file="assets/pass-icon.png")
-confirm_passwordName_icon_Label = Label(
-    confirm_passwordName_image_Label,
-    image=confirm_passwordName_icon,
-    bg="#3D404B"
-)
-confirm_passwordName_icon_Label.place(x=159, y=15)
-
-confirm_passwordName_entry = Entry(
-    confirm_passwordName_image_Label,
-    bd=0,
-    bg="#3D404B",
-    highlightthickness=0,
-    font=("yu gothic ui SemiBold", 16 * -1),
-)
-confirm_passwordName_entry.place(x=8, y=17, width=140, height=27)
-
-# =============== Submit Button ====================
-submit_buttonImage = PhotoImage(
-    file="assets/button_1.png")
-submit_button = Button(
-    bg_image,
-    image=submit_buttonImage,
-    borderwidth=0,
-    highlightthickness=0,
-    relief="flat",
-    activebackground="#272A37",
-    cursor="hand2",
-)
-submit_button .place(x=130, y=460, width=333, height=65)
-
-# ================ Header Text Down ====================
-headerText_image_down = PhotoImage(file="assets/headerText_image.png")
-headerText_image_label3 = Label(
-    bg_image,
-    image=headerText_image_down,
-    bg="#272A37"
-)
-headerText_image_label3.place(x=650, y=530)
-
-headerText3 = Label(
-    bg_image,
-    text="Luke Ezekiel B. Abad",
-    fg="#FFFFFF",
-    font=("yu gothic ui bold", 20 * -1),
-    bg="#272A37"
-)
-headerText3.place(x=700, y=530)
-
-
-window.resizable(False, False)
-window.mainloop()
+Modular register UI builder used by the main application.
+"""
+from tkinter import *
+from tkinter import messagebox
+from Database import db_utils
+from Database.connection_pool import ConnectionPool
+from image_cache import load_image
+
+
+def build_register_frame(parent, db_path, on_show_login=None, on_register_success=None, pool=None):
+    """Create and return a Frame for the register UI.
+
+    on_show_login: optional callable to show the login screen
+    on_register_success: optional callable invoked after an account is created
+    pool: optional shared ConnectionPool; one is created for db_path if omitted
+    """
+    if pool is None:
+        pool = ConnectionPool(db_path)
+
+    frame = Frame(parent, bg="#525561")
+
+    # ================Background Image ====================
+    backgroundImage = load_image(frame, "assets/image_1.png")
+    bg_image = Label(
+        frame,
+        image=backgroundImage,
+        bg="#525561"
+    )
+    bg_image.place(x=120, y=28)
+
+    # ================ Header Text Left ====================
+    headerText_image_left = load_image(frame, "assets/headerText_image.png")
+    headerText_image_label1 = Label(
+        bg_image,
+        image=headerText_image_left,
+        bg="#272A37"
+    )
+    headerText_image_label1.place(x=60, y=45)
+
+    headerText1 = Label(
+        bg_image,
+        text="Electric Bill Calculator",
+        fg="#FFFFFF",
+        font=("yu gothic ui bold", 20 * -1),
+        bg="#272A37"
+    )
+    headerText1.place(x=110, y=45)
+
+    # ================ Header Text Right ====================
+    headerText_image_right = load_image(frame, "assets/headerText_image.png")
+    headerText_image_label2 = Label(
+        bg_image,
+        image=headerText_image_right,
+        bg="#272A37"
+    )
+    headerText_image_label2.place(x=400, y=45)
+
+    headerText2 = Label(
+        bg_image,
+        anchor="nw",
+        text="CS1C Final PIT",
+        fg="#FFFFFF",
+        font=("yu gothic ui Bold", 20 * -1),
+        bg="#272A37"
+    )
+    headerText2.place(x=450, y=45)
+
+    # ================ CREATE ACCOUNT HEADER ====================
+    createAccount_header = Label(
+        bg_image,
+        text="Create new account",
+        fg="#FFFFFF",
+        font=("yu gothic ui Bold", 28 * -1),
+        bg="#272A37"
+    )
+    createAccount_header.place(x=75, y=121)
+
+    # ================ ALREADY HAVE AN ACCOUNT TEXT ====================
+    text = Label(
+        bg_image,
+        text="Already a member?",
+        fg="#FFFFFF",
+        font=("yu gothic ui Regular", 15 * -1),
+        bg="#272A37"
+    )
+    text.place(x=75, y=187)
+
+    # ================ GO TO LOGIN ====================
+    def go_to_login():
+        if callable(on_show_login):
+            on_show_login()
+
+    switchLogin = Button(
+        bg_image,
+        text="Login",
+        fg="#206DB4",
+        font=("yu gothic ui Bold", 15 * -1),
+        bg="#272A37",
+        bd=0,
+        cursor="hand2",
+        activebackground="#272A37",
+        activeforeground="#ffffff",
+        command=go_to_login
+    )
+    switchLogin.place(x=230, y=185, width=50, height=35)
+
+    # ================ First Name Section ====================
+    firstName_image = load_image(frame, "assets/input_img.png")
+    firstName_image_Label = Label(
+        bg_image,
+        image=firstName_image,
+        bg="#272A37"
+    )
+    firstName_image_Label.place(x=80, y=242)
+
+    firstName_text = Label(
+        firstName_image_Label,
+        text="First name",
+        fg="#FFFFFF",
+        font=("yu gothic ui SemiBold", 13 * -1),
+        bg="#3D404B"
+    )
+    firstName_text.place(x=25, y=0)
+
+    firstName_icon = load_image(frame, "assets/name_icon.png")
+    firstName_icon_Label = Label(
+        firstName_image_Label,
+        image=firstName_icon,
+        bg="#3D404B"
+    )
+    firstName_icon_Label.place(x=159, y=15)
+
+    firstName_entry = Entry(
+        firstName_image_Label,
+        bd=0,
+        bg="#3D404B",
+        highlightthickness=0,
+        font=("yu gothic ui SemiBold", 16 * -1),
+    )
+    firstName_entry.place(x=8, y=17, width=140, height=27)
+
+
+    # ================ Last Name Section ====================
+    lastName_image = load_image(frame, "assets/input_img.png")
+    lastName_image_Label = Label(
+        bg_image,
+        image=lastName_image,
+        bg="#272A37"
+    )
+    lastName_image_Label.place(x=293, y=242)
+
+    lastName_text = Label(
+        lastName_image_Label,
+        text="Last name",
+        fg="#FFFFFF",
+        font=("yu gothic ui SemiBold", 13 * -1),
+        bg="#3D404B"
+    )
+    lastName_text.place(x=25, y=0)
+
+    lastName_icon = load_image(frame, "assets/name_icon.png")
+    lastName_icon_Label = Label(
+        lastName_image_Label,
+        image=lastName_icon,
+        bg="#3D404B"
+    )
+    lastName_icon_Label.place(x=159, y=15)
+
+    lastName_entry = Entry(
+        lastName_image_Label,
+        bd=0,
+        bg="#3D404B",
+        highlightthickness=0,
+        font=("yu gothic ui SemiBold", 16 * -1),
+    )
+    lastName_entry.place(x=8, y=17, width=140, height=27)
+
+    # ================ Email Name Section ====================
+    emailName_image = load_image(frame, "assets/email.png")
+    emailName_image_Label = Label(
+        bg_image,
+        image=emailName_image,
+        bg="#272A37"
+    )
+    emailName_image_Label.place(x=80, y=311)
+
+    emailName_text = Label(
+        emailName_image_Label,
+        text="Email account",
+        fg="#FFFFFF",
+        font=("yu gothic ui SemiBold", 13 * -1),
+        bg="#3D404B"
+    )
+    emailName_text.place(x=25, y=0)
+
+    emailName_icon = load_image(frame, "assets/email-icon.png")
+    emailName_icon_Label = Label(
+        emailName_image_Label,
+        image=emailName_icon,
+        bg="#3D404B"
+    )
+    emailName_icon_Label.place(x=370, y=15)
+
+    emailName_entry = Entry(
+        emailName_image_Label,
+        bd=0,
+        bg="#3D404B",
+        highlightthickness=0,
+        font=("yu gothic ui SemiBold", 16 * -1),
+    )
+    emailName_entry.place(x=8, y=17, width=354, height=27)
+
+
+    # ================ Password Name Section ====================
+    passwordName_image = load_image(frame, "assets/input_img.png")
+    passwordName_image_Label = Label(
+        bg_image,
+        image=passwordName_image,
+        bg="#272A37"
+    )
+    passwordName_image_Label.place(x=80, y=380)
+
+    passwordName_text = Label(
+        passwordName_image_Label,
+        text="Password",
+        fg="#FFFFFF",
+        font=("yu gothic ui SemiBold", 13 * -1),
+        bg="#3D404B"
+    )
+    passwordName_text.place(x=25, y=0)
+
+    passwordName_icon = load_image(frame, "assets/pass-icon.png")
+    passwordName_icon_Label = Label(
+        passwordName_image_Label,
+        image=passwordName_icon,
+        bg="#3D404B"
+    )
+    passwordName_icon_Label.place(x=159, y=15)
+
+    passwordName_entry = Entry(
+        passwordName_image_Label,
+        bd=0,
+        bg="#3D404B",
+        highlightthickness=0,
+        font=("yu gothic ui SemiBold", 16 * -1),
+        show='•',
+    )
+    passwordName_entry.place(x=8, y=17, width=140, height=27)
+
+
+    # ================ Confirm Password Name Section ====================
+    confirm_passwordName_image = load_image(frame, "assets/input_img.png")
+    confirm_passwordName_image_Label = Label(
+        bg_image,
+        image=confirm_passwordName_image,
+        bg="#272A37"
+    )
+    confirm_passwordName_image_Label.place(x=293, y=380)
+
+    confirm_passwordName_text = Label(
+        confirm_passwordName_image_Label,
+        text="Confirm Password",
+        fg="#FFFFFF",
+        font=("yu gothic ui SemiBold", 13 * -1),
+        bg="#3D404B"
+    )
+    confirm_passwordName_text.place(x=25, y=0)
+
+    confirm_passwordName_icon = load_image(frame, "assets/pass-icon.png")
+    confirm_passwordName_icon_Label = Label(
+        confirm_passwordName_image_Label,
+        image=confirm_passwordName_icon,
+        bg="#3D404B"
+    )
+    confirm_passwordName_icon_Label.place(x=159, y=15)
+
+    confirm_passwordName_entry = Entry(
+        confirm_passwordName_image_Label,
+        bd=0,
+        bg="#3D404B",
+        highlightthickness=0,
+        font=("yu gothic ui SemiBold", 16 * -1),
+        show='•',
+    )
+    confirm_passwordName_entry.place(x=8, y=17, width=140, height=27)
+
+    # ================ Callbacks ====================
+    def clear_form():
+        for entry in (firstName_entry, lastName_entry, emailName_entry,
+                      passwordName_entry, confirm_passwordName_entry):
+            entry.delete(0, END)
+
+    def register():
+        first_name = firstName_entry.get().strip()
+        last_name = lastName_entry.get().strip()
+        email = emailName_entry.get().strip()
+        password = passwordName_entry.get()
+
+        if not (first_name and last_name and email and password and confirm_passwordName_entry.get()):
+            messagebox.showerror("Error", "All Fields are required")
+            return
+        if password != confirm_passwordName_entry.get():
+            messagebox.showerror("Error", "Passwords do not match")
+            return
+
+        with pool.connection() as conn:
+            created = db_utils.add_user(conn, first_name, last_name, email, password)
+        if not created:
+            messagebox.showerror("Error", "Email already exists")
+            return
+
+        clear_form()
+        if callable(on_register_success):
+            on_register_success()
+        else:
+            messagebox.showinfo("Success", "Account created successfully :)")
+
+    # =============== Submit Button ====================
+    submit_buttonImage = load_image(frame, "assets/button_1.png")
+    submit_button = Button(
+        bg_image,
+        image=submit_buttonImage,
+        borderwidth=0,
+        highlightthickness=0,
+        relief="flat",
+        activebackground="#272A37",
+        cursor="hand2",
+        command=register
+    )
+    submit_button.place(x=130, y=460, width=333, height=65)
+
+    # ================ Header Text Down ====================
+    headerText_image_down = load_image(frame, "assets/headerText_image.png")
+    headerText_image_label3 = Label(
+        bg_image,
+        image=headerText_image_down,
+        bg="#272A37"
+    )
+    headerText_image_label3.place(x=650, y=530)
+
+    headerText3 = Label(
+        bg_image,
+        text="Luke Ezekiel B. Abad",
+        fg="#FFFFFF",
+        font=("yu gothic ui bold", 20 * -1),
+        bg="#272A37"
+    )
+    headerText3.place(x=700, y=530)
+
+
+    return frame
+
+
+if __name__ == "__main__":
+    root = Tk()
+    root.geometry('1240x650+100+100')
+    root.resizable(False, False)
+    frm = build_register_frame(root, "Database/AccountSystem.db",
+                               on_register_success=lambda: print("register ok"))
+    frm.pack(fill='both', expand=True)
+    root.mainloop()
@@ -0,0 +1,147 @@
+"""tariffs.py
+
+Tariff registry loaded from tariffs.json. Each tariff has a version and an
+effective date, and is compiled once into immutable tuples: the upper bound
+of every tier, the kWh and cost at the start of each tier, and its rate.
+Pricing a reading is then a binary search plus one multiply.
+
+Rate changes are made by adding a tariff to tariffs.json; the one whose
+effective_from is the latest date not after the billing date applies.
+"""
+import json
+import os
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from datetime import date, datetime
+from types import MappingProxyType
+
+
+TARIFF_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tariffs.json")
+
+# Billing month formats understood by tariff_for_month: ISO dates, year-month
+# and the date picker's default m/d/yy
+BILLING_DATE_FORMATS = ("%Y-%m-%d", "%Y-%m", "%m/%d/%y", "%m/%d/%Y")
+
+# Compiled tier table for one consumer type. Tier k covers kWh in
+# (starts[k], uppers[k]] and costs start_costs[k] + (kWh - starts[k]) * rates[k].
+Schedule = namedtuple("Schedule", "fixed uppers starts start_costs rates")
+
+Tariff = namedtuple("Tariff", "version effective_from vat_rate env_fee_rate "
+                              "senior_discount_rate schedules default_type")
+
+
+def compile_schedule(fixed, tiers):
+    """Compile [(kWh in tier or None for unbounded, rate), ...] into a Schedule."""
+    uppers, starts, start_costs, rates = [], [], [], []
+    start = 0.0
+    cost = 0.0
+    for width, rate in tiers:
+        width = float("inf") if width is None else float(width)
+        if width <= 0:
+            raise ValueError(f"Tier width must be positive, got {width}")
+        starts.append(start)
+        start_costs.append(cost)
+        rates.append(float(rate))
+        start += width
+        uppers.append(start)
+        cost += width * rate
+    if uppers[-1] != float("inf"):
+        raise ValueError("The last tier must be unbounded (width null)")
+    return Schedule(fixed, tuple(uppers), tuple(starts), tuple(start_costs), tuple(rates))
+
+
+def price_units(units, schedule):
+    """Return (energy cost, applied rate) for a reading under schedule."""
+    if units <= 0:
+        return 0, 0
+    k = bisect_left(schedule.uppers, units)
+    return schedule.start_costs[k] + (units - schedule.starts[k]) * schedule.rates[k], schedule.rates[k]
+
+
+def compile_tariff(spec):
+    """Build an immutable Tariff from one entry of tariffs.json."""
+    schedules = {name: compile_schedule(t["fixed"], t["tiers"])
+                 for name, t in spec["consumer_types"].items()}
+    default_type = spec.get("default_type", next(iter(schedules)))
+    if default_type not in schedules:
+        raise ValueError(f"Tariff {spec['version']}: unknown default_type {default_type!r}")
+    return Tariff(
+        version=str(spec["version"]),
+        effective_from=date.fromisoformat(spec["effective_from"]),
+        vat_rate=float(spec["vat_rate"]),
+        env_fee_rate=float(spec["env_fee_rate"]),
+        senior_discount_rate=float(spec["senior_discount_rate"]),
+        schedules=MappingProxyType(schedules),
+        default_type=default_type,
+    )
+
+
+def schedule_for(tariff, customer_type):
+    """Schedule for a consumer type, falling back to the tariff default."""
+    schedule = tariff.schedules.get(customer_type)
+    return schedule if schedule is not None else tariff.schedules[tariff.default_type]
+
+
+class TariffRegistry:
+    """All tariffs from a file, ordered by effective date."""
+
+    def __init__(self, tariffs):
+        self.tariffs = tuple(sorted(tariffs, key=lambda t: t.effective_from))
+        if not self.tariffs:
+            raise ValueError("A tariff registry needs at least one tariff")
+        self._dates = [t.effective_from for t in self.tariffs]
+
+    @classmethod
+    def load(cls, path=TARIFF_FILE):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("format") != 1:
+            raise ValueError(f"Unsupported tariff file format: {data.get('format')!r}")
+        return cls(compile_tariff(spec) for spec in data["tariffs"])
+
+    def for_date(self, day):
+        """Tariff in effect on day (the earliest tariff if day predates all)."""
+        return self.tariffs[max(0, bisect_right(self._dates, day) - 1)]
+
+    def current(self):
+        return self.for_date(date.today())
+
+
+_registry = None
+
+
+def get_registry():
+    """The process-wide registry, loaded from TARIFF_FILE on first use."""
+    global _registry
+    if _registry is None:
+        _registry = TariffRegistry.load()
+    return _registry
+
+
+def set_registry(registry):
+    """Replace the process-wide registry (e.g. after editing tariffs.json)."""
+    global _registry
+    _registry = registry
+
+
+def current_tariff():
+    return get_registry().current()
+
+
+def parse_billing_date(value):
+    """date from a billing month such as 2024-03-15, 2024-03 or 3/15/24, or None."""
+    value = (value or "").strip()
+    for fmt in BILLING_DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            pass
+    return None
+
+
+def tariff_for_month(value, registry=None):
+    """Tariff in effect on a billing month; today's tariff if value holds no
+    recognisable date (e.g. a bare month name)."""
+    registry = registry or get_registry()
+    day = parse_billing_date(value)
+    return registry.current() if day is None else registry.for_date(day)
@@ -0,0 +1,24 @@
+import copy
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tariffs  # noqa: E402
+
+
+@pytest.fixture
+def two_tariffs():
+    """Registry where residential fixed charge rises to 50 from 2024-02-01."""
+    with open(tariffs.TARIFF_FILE, encoding="utf-8") as f:
+        spec = json.load(f)["tariffs"][0]
+    raised = copy.deepcopy(spec)
+    raised.update(version="test.2", effective_from="2024-02-01")
+    raised["consumer_types"]["residential"]["fixed"] = 50
+    previous = tariffs.get_registry()
+    tariffs.set_registry(tariffs.TariffRegistry(map(tariffs.compile_tariff, (spec, raised))))
+    yield
+    tariffs.set_registry(previous)
@@ -0,0 +1,38 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch_billing import calculate_bills, check_parity, tier_edges  # noqa: E402
+from billing_core import calculate_bill  # noqa: E402
+
+KEYS = ("energy", "fixed", "vat", "env", "rate", "total", "discount")
+BOUNDARIES = (0, 50, 100, 200, 300, 800, -1, -0.5, 49.999, 50.001, 99.999, 100.001)
+
+
+def test_parity_on_random_and_edge_readings():
+    assert check_parity(samples=20000, seed=1) == 0
+
+
+def test_tier_edges_include_every_finite_boundary():
+    edges = tier_edges()
+    for upper in (50.0, 100.0, 200.0, 300.0, 800.0):
+        assert upper in edges
+
+
+@pytest.mark.parametrize("customer_type", ["residential", "commercial", "unknown"])
+@pytest.mark.parametrize("is_senior", [False, True])
+def test_boundary_readings_match_scalar(customer_type, is_senior):
+    batch = calculate_bills(BOUNDARIES, [customer_type] * len(BOUNDARIES),
+                            [is_senior] * len(BOUNDARIES))
+    for i, units in enumerate(BOUNDARIES):
+        expected = calculate_bill(float(units), customer_type, is_senior)
+        assert tuple(float(batch[k][i]) for k in KEYS) == tuple(float(v) for v in expected), units
+
+
+def test_scalar_input_gives_one_row():
+    batch = calculate_bills(123, "residential", True)
+    assert batch["total"].shape == (1,)
+    assert float(batch["total"][0]) == calculate_bill(123.0, "residential", True)[5]
@@ -0,0 +1,74 @@
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from billing_service import BillingService  # noqa: E402
+
+
+async def _request(port, payload, path="/quote", headers=""):
+    """Send one request and return (status, JSON body, Connection header)."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+    writer.write(f"POST {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\n{headers}\r\n".encode() + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    response = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        response[name.strip().lower()] = value.strip()
+    data = await reader.readexactly(int(response["content-length"]))
+    writer.close()
+    return status, json.loads(data), response["connection"]
+
+
+def _serve(*payloads, path="/quote"):
+    """Start a service on a free port and return the response to each payload."""
+    async def run():
+        service = BillingService(pdf_workers=1)
+        server = await asyncio.start_server(service.handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            # sent together so they land in one micro-batch
+            return await asyncio.gather(*(_request(port, p, path) for p in payloads))
+        finally:
+            server.close()
+            service.pdf_pool.shutdown()
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("kwh", [1.7e308, -5, "nan", "abc", None, 1e7])
+def test_out_of_range_kwh_is_a_bad_request(kwh):
+    [(status, body, _)] = _serve({"kwh": kwh, "type": "residential"})
+    assert status == 400
+    assert "kWh" in body["error"]
+
+
+@pytest.mark.parametrize("senior", ["false", 0, None])
+def test_senior_must_be_a_boolean(senior):
+    [(status, _, _)] = _serve({"kwh": 10, "senior": senior})
+    assert status == 400
+
+
+def test_quotes_use_the_tariff_of_their_month(two_tariffs):
+    responses = _serve(*({"kwh": 0, "type": "residential", "month": month}
+                         for month in ("2024-01-15", "2024-02-15", "1/31/24")))
+    assert [(status, body["fixed"], body["tariff"]) for status, body, _ in responses] == [
+        (200, 40.0, "2024.1"), (200, 50.0, "test.2"), (200, 40.0, "2024.1")]
+
+
+def test_handler_errors_are_server_errors_not_bad_length(monkeypatch):
+    def broken(*args, **kwargs):
+        raise ValueError("pricing failed")
+    monkeypatch.setattr("billing_service.calculate_bills", broken)
+    [(status, body, connection)] = _serve({"kwh": 10})
+    assert status == 500
+    assert "pricing failed" in body["error"]
+    assert connection == "keep-alive"
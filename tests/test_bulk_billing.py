@@ -0,0 +1,48 @@
+import csv
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bulk_billing import INPUT_FIELDS, MAX_KWH, parse_kwh, run_bulk  # noqa: E402
+
+
+@pytest.mark.parametrize("value", ["nan", "inf", "-inf", "-3", "1e300", str(MAX_KWH + 1), "abc", ""])
+def test_parse_kwh_rejects_bad_readings(value):
+    with pytest.raises(ValueError):
+        parse_kwh(value)
+
+
+def test_bad_rows_are_skipped_and_reported(tmp_path):
+    src = tmp_path / "readings.csv"
+    with open(src, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(INPUT_FIELDS)
+        for kwh in ("120", "nan", "inf", "-1", "1e300", "0"):
+            writer.writerow(["N", "A", "addr", "Residential", "None", "2024-01", kwh])
+
+    reported = []
+    count, skipped, _ = run_bulk(src, tmp_path / "bills.csv",
+                                 on_error=lambda line, msg: reported.append(line))
+    assert (count, skipped) == (2, 4)
+    assert reported == [3, 4, 5, 6]
+    with open(tmp_path / "bills.csv", newline="", encoding="utf-8") as f:
+        totals = [row["total"] for row in csv.DictReader(f)]
+    assert totals == ["865.04", "40.00"]
+
+
+@pytest.mark.parametrize("exact", [False, True])
+def test_rows_use_the_tariff_of_their_billing_month(tmp_path, two_tariffs, exact):
+    src = tmp_path / "readings.csv"
+    with open(src, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(INPUT_FIELDS)
+        for month in ("2024-01-15", "2024-02-15", "1/31/24", "2024-02"):
+            writer.writerow(["N", "A", "addr", "Residential", "None", month, "0"])
+
+    run_bulk(src, tmp_path / "bills.csv", exact=exact)
+    with open(tmp_path / "bills.csv", newline="", encoding="utf-8") as f:
+        fixed = [row["fixed"] for row in csv.DictReader(f)]
+    assert fixed == ["40.00", "50.00", "40.00", "50.00"]
@@ -0,0 +1,60 @@
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Database.history_db import HistoryStore  # noqa: E402
+from electric_bill_gui import (BackgroundExport, write_csv_header, write_csv_rows,  # noqa: E402
+                               write_txt_footer, write_txt_header, write_txt_rows)
+
+
+def _record(i):
+    return {"timestamp": "2024-01-01 12:00:00", "customer_name": f"Customer {i}",
+            "account": f"ACC-{i}", "kwh_used": float(i), "total_cost": 10.0 * i,
+            "customer_type": "residential", "discount_value": "None",
+            "discount_amount": 0.0, "billing_month": "2024-01"}
+
+
+def _worker(db_path, path, max_id, write_rows, **kwargs):
+    """A BackgroundExport with only the worker's state (no Tk dialog)."""
+    export = BackgroundExport.__new__(BackgroundExport)
+    state = dict(db_path=db_path, path=path, max_id=max_id, total=None, write_rows=write_rows,
+                 write_header=None, write_footer=None, newline=None, totals=False,
+                 done=0, error=None, finished=False, cancel_event=threading.Event())
+    export.__dict__.update(state, **kwargs)
+    return export
+
+
+def test_txt_export_stops_at_the_snapshot_and_totals_match(tmp_path):
+    db_path = str(tmp_path / "history.db")
+    store = HistoryStore(db_path)
+    for i in range(1, 4):
+        store.add(_record(i))
+    bound = store.max_id()
+    store.add(_record(4))  # another terminal's row, added after the export started
+    store.flush()
+
+    out = tmp_path / "history.txt"
+    export = _worker(db_path, str(out), bound, write_txt_rows, write_header=write_txt_header,
+                     write_footer=write_txt_footer, totals=True)
+    export._run()
+    assert export.error is None
+    assert (export.total, export.done) == (3, 3)
+    text = out.read_text(encoding="utf-8")
+    assert "Total Records: 3" in text
+    assert "Total kWh Consumed: 6.00" in text
+    assert "Customer 3" in text and "Customer 4" not in text
+
+
+def test_csv_export_counts_in_the_worker(tmp_path):
+    db_path = str(tmp_path / "history.db")
+    store = HistoryStore(db_path)
+    for i in range(1, 6):
+        store.add(_record(i))
+    out = tmp_path / "history.csv"
+    export = _worker(db_path, str(out), store.max_id(), write_csv_rows,
+                     write_header=write_csv_header, newline="")
+    export._run()
+    assert (export.error, export.total, export.done) == (None, 5, 5)
+    assert len(out.read_text(encoding="utf-8").splitlines()) == 6
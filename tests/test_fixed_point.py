@@ -0,0 +1,32 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fixed_point import MAX_WH, WH_PER_KWH, calculate_bill_cents, calculate_bills_cents  # noqa: E402
+
+MAX_KWH = MAX_WH // WH_PER_KWH
+OUT_OF_RANGE = [float("nan"), float("inf"), float("-inf"), 1e300, 1e11, MAX_KWH * 1.001]
+
+
+@pytest.mark.parametrize("kwh", OUT_OF_RANGE)
+def test_scalar_rejects_out_of_range_readings(kwh):
+    with pytest.raises(ValueError):
+        calculate_bill_cents(kwh, "residential")
+
+
+@pytest.mark.parametrize("kwh", OUT_OF_RANGE)
+def test_batch_rejects_out_of_range_readings(kwh):
+    with pytest.raises(ValueError):
+        calculate_bills_cents([100.0, kwh], ["residential", "commercial"])
+
+
+@pytest.mark.parametrize("customer_type", ["residential", "commercial"])
+@pytest.mark.parametrize("senior", [False, True])
+def test_largest_reading_matches_and_stays_positive(customer_type, senior):
+    bill = calculate_bill_cents(MAX_KWH, customer_type, senior)
+    batch = calculate_bills_cents([MAX_KWH], [customer_type], [senior])
+    assert bill.total > 0
+    assert tuple(int(batch[k][0]) for k in bill._fields) == tuple(bill)
@@ -0,0 +1,123 @@
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Database.history_db import HistoryAggregates, HistoryStore  # noqa: E402
+
+
+def _record(i, customer_type="residential", month="2024-01"):
+    return {"timestamp": f"2024-01-01 12:00:{i % 60:02d}", "customer_name": f"Customer {i}",
+            "account": f"ACC-{i}", "kwh_used": float(i), "total_cost": 10.0 * i,
+            "customer_type": customer_type, "discount_value": "None",
+            "discount_amount": 0.5 * i, "billing_month": month}
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "history.db")
+
+
+def _rows_on_disk(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM HistoryDB").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_add_writes_in_batches(db_path):
+    store = HistoryStore(db_path, batch_size=3)
+    store.add(_record(1))
+    store.add(_record(2))
+    assert (store.pending, _rows_on_disk(db_path)) == (2, 0)
+    store.add(_record(3))
+    assert (store.pending, _rows_on_disk(db_path)) == (0, 3)
+    store.add(_record(4))
+    store.close()
+    assert _rows_on_disk(db_path) == 4
+
+
+def test_iter_records_stops_at_max_id(db_path):
+    store = HistoryStore(db_path)
+    for i in range(1, 6):
+        store.add(_record(i))
+    bound = store.max_id()
+    store.add(_record(6))
+    names = [r["customer_name"] for r in store.iter_records(page_size=2, max_id=bound)]
+    assert names == [f"Customer {i}" for i in range(1, 6)]
+    assert len(list(store.iter_records(page_size=2))) == 6
+    assert [r["account"] for r in store.iter_records(account="ACC-6")] == ["ACC-6"]
+
+
+def test_page_count_and_aggregates(db_path):
+    store = HistoryStore(db_path)
+    for i in range(1, 8):
+        store.add(_record(i, "commercial" if i % 2 else "residential", f"2024-0{i % 3 + 1}"))
+    assert store.count() == 7
+    assert store.count(max_id=4) == 4
+
+    agg = store.aggregates()
+    assert (agg.count, agg.kwh, agg.cost, agg.discount) == (7, 28.0, 280.0, 14.0)
+    assert {k: t.count for k, t in agg.by_type.items()} == {"commercial": 4, "residential": 3}
+    assert {k: t.count for k, t in agg.by_month.items()} == {"2024-01": 2, "2024-02": 3, "2024-03": 2}
+    assert store.aggregates(max_id=4).count == 4
+
+
+def test_pages_are_keyed_on_id(db_path):
+    store = HistoryStore(db_path)
+    for i in range(1, 8):
+        store.add(_record(i))
+    newest = store.page(3)
+    assert [r["id"] for r in newest] == [5, 6, 7]
+    older = store.page(3, before_id=newest[0]["id"])
+    assert [r["kwh_used"] for r in older] == [2.0, 3.0, 4.0]
+
+    # Rows added by another terminal do not shift pages already located
+    other = HistoryStore(db_path)
+    other.add(_record(8))
+    other.flush()
+    assert store.page(3, before_id=newest[0]["id"]) == older
+    assert [r["id"] for r in store.page(3, after_id=older[-1]["id"])] == [5, 6, 7]
+    assert [r["id"] for r in store.page(3, after_id=7)] == [8]
+    assert [r["id"] for r in store.page(3, before_id=2)] == [1]
+
+
+def test_clear_only_deletes_this_sessions_rows(db_path):
+    mine = HistoryStore(db_path)
+    theirs = HistoryStore(db_path)
+    mine.add(_record(1))
+    theirs.add(_record(2))
+    theirs.flush()
+    mine.add(_record(3))
+    mine.clear()
+    assert [r["customer_name"] for r in mine.iter_records()] == ["Customer 2"]
+
+
+def test_tables_without_a_session_column_are_upgraded(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE HistoryDB(ID INTEGER PRIMARY KEY, Timestamp TEXT, CustomerName TEXT, "
+                 "Account TEXT, KwhUsed REAL, TotalCost REAL, CustomerType TEXT, "
+                 "DiscountValue TEXT, DiscountAmount REAL, BillingMonth TEXT)")
+    conn.execute("INSERT INTO HistoryDB(CustomerName, KwhUsed) VALUES ('Legacy', 1.0)")
+    conn.commit()
+    conn.close()
+
+    store = HistoryStore(db_path)
+    store.add(_record(1))
+    store.clear()
+    assert [r["customer_name"] for r in store.iter_records()] == ["Legacy"]
+
+
+def test_aggregates_remove_returns_to_empty():
+    agg = HistoryAggregates()
+    records = [_record(1), _record(2, "commercial", "2024-02")]
+    for r in records:
+        agg.add(r)
+    assert (agg.count, agg.kwh, sorted(agg.by_type)) == (2, 3.0, ["commercial", "residential"])
+    for r in records:
+        agg.remove(r)
+    assert (agg.count, agg.kwh, agg.cost, agg.by_type, agg.by_month) == (0, 0.0, 0.0, {}, {})
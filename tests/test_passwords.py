@@ -0,0 +1,102 @@
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Database import db_utils, passwords  # noqa: E402
+from Database.passwords import PasswordPolicy  # noqa: E402
+
+# Cheap costs so the tests stay fast; the formats are the real ones
+FAST_SCRYPT = PasswordPolicy("scrypt", n=16, r=8, p=1)
+FAST_PBKDF2 = PasswordPolicy("pbkdf2_sha256", i=1000)
+
+
+@pytest.fixture(autouse=True)
+def fast_policy():
+    previous = passwords.get_policy()
+    passwords.set_policy(FAST_SCRYPT)
+    db_utils.clear_user_cache()
+    yield
+    passwords.set_policy(previous)
+    db_utils.clear_user_cache()
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "accounts.db"))
+    db_utils.ensure_table(conn)
+    yield conn
+    conn.close()
+
+
+def _stored(conn, email):
+    return conn.execute("SELECT Password FROM AccountDB WHERE EMAIL = ?", (email,)).fetchone()[0]
+
+
+@pytest.mark.parametrize("policy", [FAST_SCRYPT, FAST_PBKDF2], ids=["scrypt", "pbkdf2"])
+def test_hash_verify_round_trip(policy):
+    encoded = passwords.hash_password("correct horse", policy)
+    assert encoded.startswith(policy.scheme + "$")
+    assert passwords.verify_password("correct horse", encoded)
+    assert not passwords.verify_password("wrong horse", encoded)
+    assert passwords.hash_password("correct horse", policy) != encoded  # salted
+    assert not passwords.needs_rehash(encoded, policy)
+
+
+def test_needs_rehash_when_the_policy_changes():
+    encoded = passwords.hash_password("pw", FAST_SCRYPT)
+    assert passwords.needs_rehash(encoded, PasswordPolicy("scrypt", n=32, r=8, p=1))
+    assert passwords.needs_rehash(encoded, FAST_PBKDF2)
+    assert passwords.needs_rehash("plaintext")
+
+
+@pytest.mark.parametrize("encoded", [
+    "scrypt$n=1$AAAA$AAAA",
+    "scrypt$n=3,r=8,p=1$AAAA$AAAA",
+    "scrypt$n=16,r=8$AAAA$AAAA",
+    "scrypt$garbage$AAAA$AAAA",
+    "pbkdf2_sha256$i=0$AAAA$AAAA",
+    "pbkdf2_sha256$i=x$AAAA$AAAA",
+])
+def test_malformed_hashes_never_verify(encoded):
+    assert not passwords.verify_password("pw", encoded)
+    assert not passwords.verify_password(encoded, encoded)  # not taken as plaintext
+    assert passwords.needs_rehash(encoded)
+
+
+def test_legacy_plaintext_row_is_upgraded_on_login(conn):
+    conn.execute("INSERT INTO AccountDB(FirstName, LastName, EMAIL, Password) "
+                 "VALUES ('Old', 'User', 'old@example.com', 'secret')")
+    conn.commit()
+    assert not db_utils.verify_user(conn, "old@example.com", "wrong")
+    assert _stored(conn, "old@example.com") == "secret"
+    assert db_utils.verify_user(conn, "old@example.com", "secret")
+    assert _stored(conn, "old@example.com").startswith("scrypt$")
+    assert db_utils.verify_user(conn, "old@example.com", "secret")
+
+
+def test_login_rehashes_with_the_new_policy(conn):
+    assert db_utils.add_user(conn, "A", "B", "a@example.com", "pw")
+    assert not passwords.needs_rehash(_stored(conn, "a@example.com"))
+    passwords.set_policy(FAST_PBKDF2)
+    assert db_utils.verify_user(conn, "a@example.com", "pw")
+    stored = _stored(conn, "a@example.com")
+    assert stored.startswith("pbkdf2_sha256$")
+    assert not passwords.needs_rehash(stored)
+
+
+def test_unknown_email_checks_a_dummy_hash_of_the_current_policy(conn, monkeypatch):
+    checked = []
+    verify = passwords.verify_password
+    monkeypatch.setattr(passwords, "verify_password",
+                        lambda password, encoded: checked.append(encoded) or verify(password, encoded))
+
+    assert not db_utils.verify_user(conn, "nobody@example.com", "pw")
+    passwords.set_policy(FAST_PBKDF2)
+    assert not db_utils.verify_user(conn, "nobody@example.com", "pw")
+    assert [e.split("$")[0] for e in checked] == ["scrypt", "pbkdf2_sha256"]
+    assert not any(passwords.needs_rehash(e, policy)
+                   for e, policy in zip(checked, (FAST_SCRYPT, FAST_PBKDF2)))
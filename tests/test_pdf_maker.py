@@ -0,0 +1,38 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pdf_maker import generate_bill_pdfs  # noqa: E402
+
+
+def _bill(account, month):
+    return {"name": "Juan Dela Cruz", "account": account, "address": "Manila",
+            "type": "Residential", "discount": "None", "discount_amount": "0.00",
+            "month": month, "kwh": "250", "rate": "8.00", "fixed": "40.00",
+            "base": "1525.00", "env": "3.81", "vat": "183.00", "total": "1751.81"}
+
+
+def test_repeated_names_get_distinct_files(tmp_path):
+    bills = [_bill("ACC-1", "Jan"), _bill("ACC-1", "Jan"), _bill("ACC-2", "Jan")]
+    written, failures = generate_bill_pdfs(bills, str(tmp_path), workers=1)
+    assert (written, failures) == (3, [])
+    assert sorted(os.listdir(tmp_path)) == ["ACC-1_Jan-2.pdf", "ACC-1_Jan.pdf", "ACC-2_Jan.pdf"]
+    for name in os.listdir(tmp_path):
+        assert (tmp_path / name).read_bytes().startswith(b"%PDF")
+
+
+def test_existing_files_are_not_overwritten(tmp_path):
+    existing = tmp_path / "ACC-1_Jan.pdf"
+    existing.write_bytes(b"keep me")
+    written, failures = generate_bill_pdfs([_bill("ACC-1", "Jan"), _bill("ACC-2", "Jan")],
+                                           str(tmp_path), workers=1)
+    assert written == 1
+    assert failures == [(str(existing), "file already exists (not overwritten)")]
+    assert existing.read_bytes() == b"keep me"
+    assert (tmp_path / "ACC-2_Jan.pdf").read_bytes().startswith(b"%PDF")
+
+    written, failures = generate_bill_pdfs([_bill("ACC-1", "Jan")], str(tmp_path),
+                                           workers=1, overwrite=True)
+    assert (written, failures) == (1, [])
+    assert existing.read_bytes().startswith(b"%PDF")